@@ -1,10 +1,11 @@
 # 01_create_game.py
 import os
-import json
 import requests
 import chess
 from pathlib import Path
 from datetime import datetime, timezone
+import archive_parties
+import ecriture_atomique
 
 # --- Chargement des variables d'environnement ---
 HUMAN_TOKEN = os.getenv("LICHESS_HUMAN_TOKEN")
@@ -84,17 +85,21 @@ if __name__ == "__main__":
     accepter_defi_bot(cid)
     print(f"🎯 Partie prête : https://lichess.org/{cid}")
 
+    # Archive de la partie précédente avant d'écraser data/
+    try:
+        archive_parties.archiver_partie_courante()
+    except Exception as e:
+        print("⚠️ Archivage de la partie précédente impossible:", e)
+
     # Sauvegardes locales initiales
     starting_fen = chess.STARTING_FEN
-    GAME_ID_FILE.write_text(cid, encoding="utf-8")
-    POSITION_FILE.write_text(starting_fen, encoding="utf-8")
-    COUP_BLANCS_FILE.write_text("", encoding="utf-8")
-    LAST_MOVE_FILE.write_text(
-        json.dumps(
-            {"dernier_coup": None, "fen": starting_fen, "horodatage": datetime.now(timezone.utc).isoformat()},
-            ensure_ascii=False, indent=2
-        ),
-        encoding="utf-8"
-    )
+    with ecriture_atomique.verrou():
+        ecriture_atomique.ecrire_texte(GAME_ID_FILE, cid)
+        ecriture_atomique.ecrire_texte(POSITION_FILE, starting_fen)
+        ecriture_atomique.ecrire_texte(COUP_BLANCS_FILE, "")
+        ecriture_atomique.ecrire_json(
+            LAST_MOVE_FILE,
+            {"dernier_coup": None, "fen": starting_fen, "horodatage": datetime.now(timezone.utc).isoformat()}
+        )
 
     print(f"💾 Données initiales sauvegardées dans {DATA_DIR}")
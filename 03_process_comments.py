@@ -1,4 +1,11 @@
+import profilage
+profilage.activer("03_process_comments")
+
 import os
+import asyncio
+import hashlib
+import hmac
+import time
 import requests
 import json
 import re
@@ -8,18 +15,34 @@ import sys
 from collections import Counter
 from datetime import datetime, timezone
 from pathlib import Path
+import serveur_live
+import legalite_batch
+import ecriture_atomique
 
 # -----------------------
 # Config
 # -----------------------
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 YOUTUBE_VIDEO_ID = os.getenv("YOUTUBE_VIDEO_ID")
+# Vidéos supplémentaires (Shorts, etc.), séparées par des virgules
+YOUTUBE_VIDEO_IDS = os.getenv("YOUTUBE_VIDEO_IDS", "")
 LICHESS_BOT_TOKEN = os.getenv("LICHESS_BOT_TOKEN")
 LAST_MOVE_FILE = Path("data/dernier_coup.json")
 GAME_ID_FILE = Path("data/game_id.txt")
 COUP_BLANCS_FILE = Path("data/coup_blanc.txt")
-
-missing = [v for v in ["YOUTUBE_API_KEY", "YOUTUBE_VIDEO_ID", "LICHESS_BOT_TOKEN"] if not globals()[v]]
+VOTES_FILE = Path("data/votes.json")
+CURSORS_FILE = Path("data/curseurs_commentaires.json")
+# Clé des pseudonymes de votants (votes.json est public) ; à défaut, dérivée du token bot
+VOTE_SALT = os.getenv("VOTE_SALT") or LICHESS_BOT_TOKEN or ""
+PSEUDO_RE = re.compile(r"^[0-9a-f]{24}$")
+
+SOURCES = list(dict.fromkeys(
+    v.strip() for v in [YOUTUBE_VIDEO_ID or "", *YOUTUBE_VIDEO_IDS.split(",")] if v.strip()
+))
+
+missing = [v for v in ["YOUTUBE_API_KEY", "LICHESS_BOT_TOKEN"] if not globals()[v]]
+if not SOURCES:
+    missing.append("YOUTUBE_VIDEO_ID")
 if missing:
     raise SystemExit(f"❌ Secrets manquants : {', '.join(missing)}")
 
@@ -53,8 +76,12 @@ def load_game_id():
         log("game_id.txt introuvable", "err")
         return None
 
-def recuperer_commentaires(video_id, apres=None):
-    """Récupère les commentaires YouTube plus récents que 'apres'."""
+def recuperer_commentaires(video_id, apres=None, session=None):
+    """
+    Récupère les commentaires YouTube plus récents que 'apres'.
+    Chaque commentaire : {"id", "auteur", "texte", "date", "source"}.
+    """
+    http = session or requests
     commentaires = []
     url = "https://www.googleapis.com/youtube/v3/commentThreads"
     params = {
@@ -66,28 +93,94 @@ def recuperer_commentaires(video_id, apres=None):
     }
     stop = False
     while True:
-        r = requests.get(url, params=params, timeout=10)
+        r = http.get(url, params=params, timeout=10)
         if r.status_code != 200:
-            log(f"Erreur API YouTube : {r.status_code} {r.text}", "err")
+            log(f"Erreur API YouTube ({video_id}) : {r.status_code} {r.text}", "err")
             break
 
         data = r.json()
         for item in data.get("items", []):
-            snippet = item["snippet"]["topLevelComment"]["snippet"]
+            top = item["snippet"]["topLevelComment"]
+            snippet = top["snippet"]
             texte = snippet["textDisplay"]
             date_pub = datetime.fromisoformat(snippet["publishedAt"].replace("Z", "+00:00"))
             if apres and date_pub <= apres:
                 stop = True
                 continue
-            commentaires.append(texte)
+            auteur = snippet.get("authorChannelId", {}).get("value") or snippet.get("authorDisplayName") or top.get("id")
+            commentaires.append({
+                "id": top.get("id"),
+                "auteur": auteur,
+                "texte": texte,
+                "date": date_pub,
+                "source": video_id,
+            })
 
         if stop or "nextPageToken" not in data:
             break
         params["pageToken"] = data["nextPageToken"]
 
-    log(f"{len(commentaires)} commentaire(s) récupéré(s) après filtrage temporel", "ok")
+    log(f"{len(commentaires)} commentaire(s) récupéré(s) après filtrage temporel ({video_id})", "ok")
     return commentaires
 
+# -----------------------
+# Ingestion multi-sources
+# -----------------------
+def charger_curseurs():
+    """Date du commentaire le plus récent déjà lu, par vidéo."""
+    if not CURSORS_FILE.exists():
+        return {}
+    try:
+        data = json.loads(CURSORS_FILE.read_text(encoding="utf-8"))
+        return {vid: datetime.fromisoformat(ts) for vid, ts in data.items()}
+    except Exception as e:
+        log(f"Erreur lecture {CURSORS_FILE} : {e} → curseurs ignorés", "warn")
+        return {}
+
+def sauvegarder_curseurs(curseurs):
+    ecriture_atomique.ecrire_json(CURSORS_FILE, {vid: dt.isoformat() for vid, dt in curseurs.items()})
+
+async def _recuperer_sources(video_ids, curseurs, apres):
+    """Interroge toutes les vidéos en parallèle via un pool de connexions partagé."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max(len(video_ids), 1))
+    session.mount("https://", adapter)
+
+    async def une_source(vid):
+        debut = time.perf_counter()
+        depuis = max(apres, curseurs[vid]) if vid in curseurs else apres
+        try:
+            coms = await asyncio.to_thread(recuperer_commentaires, vid, depuis, session)
+        except Exception as e:
+            log(f"Source {vid} en échec : {e}", "err")
+            coms = []
+        return vid, coms, time.perf_counter() - debut
+
+    try:
+        return await asyncio.gather(*(une_source(vid) for vid in video_ids))
+    finally:
+        session.close()
+
+def recuperer_commentaires_multi(video_ids, apres):
+    """
+    Récupère les nouveaux commentaires de toutes les sources (curseur par source).
+    Renvoie (commentaires, curseurs mis à jour).
+    """
+    curseurs = charger_curseurs()
+    debut = time.perf_counter()
+    resultats = asyncio.run(_recuperer_sources(video_ids, curseurs, apres))
+    total = time.perf_counter() - debut
+
+    commentaires = []
+    for vid, coms, duree in resultats:
+        log(f"Source {vid} : {len(coms)} nouveau(x) commentaire(s) en {duree:.2f}s", "find")
+        commentaires.extend(coms)
+        if coms:
+            curseurs[vid] = max([c["date"] for c in coms] + ([curseurs[vid]] if vid in curseurs else []))
+    plus_lente = max((d for _, _, d in resultats), default=0.0)
+    log(f"Ingestion terminée en {total:.2f}s (source la plus lente : {plus_lente:.2f}s)", "ok")
+    return commentaires, curseurs
+
 def _sans_accents(s: str) -> str:
     return "".join(c for c in unicodedata.normalize("NFD", s) if unicodedata.category(c) != "Mn")
 
@@ -137,59 +230,121 @@ def nettoyer_et_corriger_san(commentaire: str) -> str:
     cleaned = normalize_promotion(cleaned)  # ✅ applique la normalisation FR→EN
     return cleaned
 
-def extraire_coups_valides(board, commentaires):
-    valides = []
-
-    def try_parse(board, token):
-        # Essai direct en SAN
-        try:
-            return board.parse_san(token)
-        except Exception:
-            pass
+def try_parse(board, token):
+    # Essai direct en SAN
+    try:
+        return board.parse_san(token)
+    except Exception:
+        pass
 
-        # Essai direct en UCI
-        try:
-            mv = chess.Move.from_uci(token.lower())
-            if mv in board.legal_moves:
-                return mv
-        except Exception:
-            pass
-
-        # Fallback : comparer les SAN des coups légaux
-        candidates = []
-        for mv in board.legal_moves:
-            san = board.san(mv)
-            if san.endswith(token[-3:]):  # ex: "xa4"
-                candidates.append(mv)
-
-        if len(candidates) == 1:
-            return candidates[0]
-        return None
+    # Essai direct en UCI
+    try:
+        mv = chess.Move.from_uci(token.lower())
+        if mv in board.legal_moves:
+            return mv
+    except Exception:
+        pass
+
+    # Fallback : comparer les SAN des coups légaux
+    candidates = []
+    for mv in board.legal_moves:
+        san = board.san(mv)
+        if san.endswith(token[-3:]):  # ex: "xa4"
+            candidates.append(mv)
+
+    if len(candidates) == 1:
+        return candidates[0]
+    return None
+
+def valider_commentaire(board, com):
+    """Renvoie le coup UCI exprimé par le commentaire, ou None."""
+    log(f"📝 Commentaire brut : {com}", "info")
+    token = nettoyer_et_corriger_san(com)
+    log(f"   ↳ Token nettoyé : {token}", "info")
+
+    move = try_parse(board, token)
+
+    if move and move in board.legal_moves:
+        log(f"   ✅ Coup retenu : {board.san(move)} ({move.uci()})", "ok")
+        return move.uci()
+    log(f"   ❌ Coup rejeté : {token}", "warn")
+    return None
 
+def extraire_coups_valides(board, commentaires):
+    valides = []
     for com in commentaires:
-        log(f"📝 Commentaire brut : {com}", "info")
-        token = nettoyer_et_corriger_san(com)
-        log(f"   ↳ Token nettoyé : {token}", "info")
-
-        move = try_parse(board, token)
-
-        if move and move in board.legal_moves:
-            log(f"   ✅ Coup retenu : {board.san(move)} ({move.uci()})", "ok")
-            valides.append(move.uci())
-        else:
-            log(f"   ❌ Coup rejeté : {token}", "warn")
-
+        uci = valider_commentaire(board, com)
+        if uci:
+            valides.append(uci)
     return valides
 
+def extraire_coups_valides_batch(fens, flux):
+    """
+    Version en lot de extraire_coups_valides pour plusieurs positions à la fois.
+    flux : liste (indice dans fens, commentaire brut).
+    Renvoie (acceptes: np.ndarray bool, coups UCI ou None, Counter par position).
+    """
+    tokens = {}
+    paires = [(i, tokens[com] if com in tokens else tokens.setdefault(com, nettoyer_et_corriger_san(com))) for i, com in flux]
+    return legalite_batch.resoudre_batch(fens, paires)
+
+def pseudonyme(auteur):
+    """Identifiant de votant stable mais non réversible (HMAC-SHA256 salé de l'authorChannelId)."""
+    return hmac.new(VOTE_SALT.encode("utf-8"), auteur.encode("utf-8"), hashlib.sha256).hexdigest()[:24]
+
+def fusionner_votes(board, commentaires):
+    """
+    Fusionne les nouveaux commentaires dans le décompte du demi-coup en cours
+    (votes.json, remis à zéro quand la position change). Une voix par auteur,
+    toutes sources confondues : son commentaire valide le plus récent l'emporte.
+    Les votants sont indexés par pseudonyme, jamais par identifiant YouTube.
+    """
+    votants = {}
+    if VOTES_FILE.exists():
+        try:
+            data = json.loads(VOTES_FILE.read_text(encoding="utf-8"))
+            if data.get("fen") == board.fen():
+                # Anciens votes.json indexés par authorChannelId : pseudonymisés à la relecture
+                votants = {k if PSEUDO_RE.match(k) else pseudonyme(k): v for k, v in data.get("votants", {}).items()}
+        except Exception as e:
+            log(f"Erreur lecture votes.json : {e} → décompte repris à zéro", "warn")
+
+    for com in sorted(commentaires, key=lambda c: c["date"]):
+        uci = valider_commentaire(board, com["texte"])
+        if not uci:
+            continue
+        cle = pseudonyme(com["auteur"])
+        precedent = votants.get(cle)
+        if precedent and precedent["date"] > com["date"].isoformat():
+            continue
+        votants[cle] = {"coup": uci, "source": com["source"], "date": com["date"].isoformat()}
+    return votants
+
 def choisir_coup_majoritaire(coups):
     return Counter(coups).most_common(1)[0][0] if coups else None
 
+def sauvegarder_votes(board, votants):
+    """Écrit le décompte des votes (lu par le serveur live / les overlays)."""
+    coups = [v["coup"] for v in votants.values()]
+    par_source = {}
+    for v in votants.values():
+        par_source.setdefault(v["source"], Counter())[v["coup"]] += 1
+    payload = {
+        "fen": board.fen(),
+        "votes": dict(Counter(coups).most_common()),
+        "total": len(coups),
+        "par_source": {src: dict(c.most_common()) for src, c in par_source.items()},
+        "votants": votants,
+        "horodatage": datetime.now(timezone.utc).isoformat(),
+    }
+    contenu = json.dumps(payload, ensure_ascii=False, indent=2)
+    ecriture_atomique.ecrire_texte(VOTES_FILE, contenu)
+    serveur_live.publier("votes", contenu.encode("utf-8"))
+
 def sauvegarder_coup_blanc(coup, horodatage):
-    COUP_BLANCS_FILE.write_text(coup or "", encoding="utf-8")
-    LAST_MOVE_FILE.write_text(json.dumps(
-        {"horodatage": horodatage.isoformat()},
-        ensure_ascii=False, indent=2
-    ), encoding="utf-8")
+    with ecriture_atomique.verrou():
+        ecriture_atomique.ecrire_texte(COUP_BLANCS_FILE, coup or "")
+        ecriture_atomique.ecrire_json(LAST_MOVE_FILE, {"horodatage": horodatage.isoformat()})
     log(f"coup_blanc.txt mis à jour: '{coup}'", "save")
 
 def fetch_current_board_from_lichess():
@@ -225,7 +380,7 @@ def fetch_current_board_from_lichess():
 if __name__ == "__main__":
     log("=== DÉBUT DU SCRIPT ===", "info")
     dernier_coup_time = charger_horodatage_dernier_coup()
-    commentaires = recuperer_commentaires(YOUTUBE_VIDEO_ID, apres=dernier_coup_time)
+    commentaires, curseurs = recuperer_commentaires_multi(SOURCES, apres=dernier_coup_time)
     if not commentaires:
         log("Aucun commentaire reçu → on ne fait rien", "warn")
         sys.exit(0)
@@ -238,8 +393,14 @@ if __name__ == "__main__":
     if not board:
         sys.exit(0)
 
-    coups_valides = extraire_coups_valides(board, commentaires)
+    votants = fusionner_votes(board, commentaires)
+    coups_valides = [v["coup"] for v in votants.values()]
     coup_choisi = choisir_coup_majoritaire(coups_valides)
+    sauvegarder_votes(board, votants)
+    sauvegarder_curseurs(curseurs)
+    for src in SOURCES:
+        n = sum(1 for v in votants.values() if v["source"] == src)
+        log(f"Votes retenus pour {src} : {n}", "info")
 
     if coup_choisi:
         # ✅ Met à jour uniquement si coup valide
@@ -1,5 +1,8 @@
 # 04_play_white.py — version "account/playing" fiable, mise à jour move_history.json immédiate
 
+import profilage
+profilage.activer("04_play_white")
+
 import os
 import requests
 import json
@@ -9,6 +12,8 @@ import io
 import time
 from datetime import datetime, timezone
 from pathlib import Path
+import serveur_live
+import ecriture_atomique
 
 # -----------------------
 # Config et fichiers
@@ -19,6 +24,7 @@ FEN_FILE = Path("data/position.fen")
 COUP_BLANCS_FILE = Path("data/coup_blanc.txt")
 MOVE_HISTORY_FILE = Path("data/move_history.json")
 PGN_FILE = Path("data/game.pgn")
+VOTES_FILE = Path("data/votes.json")
 
 if not LICHESS_HUMAN_TOKEN:
     raise SystemExit("❌ LICHESS_HUMAN_TOKEN manquant.")
@@ -75,36 +81,57 @@ def download_pgn(game_id):
     if r.status_code != 200:
         log(f"Erreur API Lichess : {r.status_code} {r.text[:200]}", "err")
         return None
-    PGN_FILE.write_text(r.text, encoding="utf-8")
+    ecriture_atomique.ecrire_texte(PGN_FILE, r.text)
     return r.text
 
 def update_position_files(fen, last_move):
-    FEN_FILE.write_text(fen or "", encoding="utf-8")
     payload = {
         "dernier_coup": last_move,
         "fen": fen,
         "horodatage": datetime.now(timezone.utc).isoformat(),
     }
-    LAST_MOVE_FILE.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    contenu = json.dumps(payload, ensure_ascii=False, indent=2)
+    with ecriture_atomique.verrou():
+        ecriture_atomique.ecrire_texte(FEN_FILE, fen or "")
+        ecriture_atomique.ecrire_texte(LAST_MOVE_FILE, contenu)
     log("position.fen et dernier_coup.json mis à jour", "ok")
+    serveur_live.publier("position", (fen or "").encode("utf-8"))
+    serveur_live.publier("dernier_coup", contenu.encode("utf-8"))
 
-def append_move_to_history(couleur, coup, fen):
-    history = []
-    if MOVE_HISTORY_FILE.exists():
-        try:
-            history = json.loads(MOVE_HISTORY_FILE.read_text(encoding="utf-8"))
-            if not isinstance(history, list):
-                history = []
-        except Exception:
-            pass
-    history.append({
+def load_votes(fen):
+    """Décompte des votes (votes.json) si il correspond à la position jouée."""
+    if not VOTES_FILE.exists():
+        return None
+    try:
+        data = json.loads(VOTES_FILE.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    return data.get("votes") if data.get("fen") == fen else None
+
+def append_move_to_history(couleur, coup, fen, votes=None):
+    entry = {
         "couleur": couleur,
         "coup": coup,
         "fen_apres": fen,
         "horodatage": datetime.now(timezone.utc).isoformat()
-    })
-    MOVE_HISTORY_FILE.write_text(json.dumps(history, ensure_ascii=False, indent=2), encoding="utf-8")
+    }
+    if votes:
+        entry["votes"] = votes
+    # Lecture + ajout + écriture sous le même verrou : aucun ajout concurrent perdu
+    with ecriture_atomique.verrou():
+        history = []
+        if MOVE_HISTORY_FILE.exists():
+            try:
+                history = json.loads(MOVE_HISTORY_FILE.read_text(encoding="utf-8"))
+                if not isinstance(history, list):
+                    history = []
+            except Exception:
+                pass
+        history.append(entry)
+        contenu = json.dumps(history, ensure_ascii=False, indent=2)
+        ecriture_atomique.ecrire_texte(MOVE_HISTORY_FILE, contenu)
     log(f"Coup {couleur} ajouté à {MOVE_HISTORY_FILE}", "save")
+    serveur_live.publier("historique", contenu.encode("utf-8"))
 
 def to_uci(board, move_str):
     move_str = move_str.strip()
@@ -166,12 +193,13 @@ if __name__ == "__main__":
     log(f"Coup joué : {move_uci} ({san_str})", "ok")
 
     # ✅ Mettre à jour l’état local immédiatement
+    votes = load_votes(board.fen())
     board.push(chess.Move.from_uci(move_uci))
     update_position_files(board.fen(), move_uci)
-    append_move_to_history("blanc", move_uci, board.fen())
+    append_move_to_history("blanc", move_uci, board.fen(), votes=votes)
 
     # (optionnel) on archive le PGN après une petite attente
     time.sleep(2)
     pgn_after = download_pgn(game_id)
     if pgn_after:
-        PGN_FILE.write_text(pgn_after, encoding="utf-8")
+        ecriture_atomique.ecrire_texte(PGN_FILE, pgn_after)
@@ -1,8 +1,12 @@
 # 05_play_black.py — version robuste avec account/playing (sans game_id)
 
+import profilage
+profilage.activer("05_play_black")
+
 import os
 import requests
 from pathlib import Path
+import tournoi_calibrage
 
 # ----- Config -----
 REPO = "Cyril-a11y/Youtube-V6"
@@ -52,7 +56,7 @@ def _gh_headers():
         "X-GitHub-Api-Version": "2022-11-28",
     }
 
-def trigger_bot_workflow(elo: int, mode="uci", depth=None):
+def trigger_bot_workflow(elo: int, mode="uci", depth=None, valeur=None):
     """Déclenche le workflow GitHub Actions pour jouer un coup"""
     if not GITHUB_TOKEN:
         log("Pas de GH_WORKFLOW_TOKEN défini.", "❌")
@@ -60,15 +64,19 @@ def trigger_bot_workflow(elo: int, mode="uci", depth=None):
 
     url = f"https://api.github.com/repos/{REPO}/actions/workflows/{WORKFLOW_FILENAME}/dispatches"
     payload = {"ref": "main", "inputs": {"elo": str(elo)}}
+    if profilage.demande():
+        payload["inputs"]["profile"] = "1"
 
     if mode != "uci":
         payload["inputs"]["mode"] = mode
         if depth:
             payload["inputs"]["depth"] = str(depth)
+    if valeur:
+        payload["inputs"]["valeur"] = str(valeur)
 
     r = requests.post(url, headers=_gh_headers(), json=payload, timeout=20)
     if r.status_code == 204:
-        log(f"✅ Workflow bot déclenché ({mode}, Elo={elo}{' depth='+str(depth) if depth else ''})")
+        log(f"✅ Workflow bot déclenché ({mode}, Elo={elo}{' depth='+str(depth) if depth else ''}{' valeur='+str(valeur) if valeur else ''})")
         return True
     log(f"Erreur dispatch ({r.status_code}): {r.text}", "❌")
     return False
@@ -111,13 +119,22 @@ if __name__ == "__main__":
         BOT_ELO = 3190
 
     # Détermination du mode de jeu
-    if BOT_ELO <= 300:
-        # simulation "débutant aléatoire"
-        trigger_bot_workflow(elo=1320, mode="random")
+    calibre = tournoi_calibrage.config_pour_elo(BOT_ELO) if BOT_ELO < 1320 else None
+    if calibre:
+        # table mesurée par tournoi_calibrage.py (data/calibration_elo.json)
+        mode, valeur = calibre
+        log(f"Calibration : Elo {BOT_ELO} → {mode}{':' + str(valeur) if valeur else ''}")
+        # elo = Elo demandé (run_bot.yml le réécrit dans bot_elo.txt) ; la force calibrée
+        # passe par depth (mode depth) ou valeur (skill / uci)
+        if mode == "depth":
+            trigger_bot_workflow(elo=BOT_ELO, mode="depth", depth=valeur)
+        elif mode == "random":
+            trigger_bot_workflow(elo=BOT_ELO, mode="random")
+        else:
+            trigger_bot_workflow(elo=BOT_ELO, mode=mode, valeur=valeur)
     elif BOT_ELO < 1320:
-        # simulation faible via depth
-        depth = 1 if BOT_ELO < 800 else (2 if BOT_ELO < 1100 else 3)
-        trigger_bot_workflow(elo=1320, mode="depth", depth=depth)
+        # simulation faible : une recherche MultiPV + tirage selon l'Elo (niveau_bot.py)
+        trigger_bot_workflow(elo=BOT_ELO, mode="skill")
     else:
         # Elo normal (1320 → 3190)
         trigger_bot_workflow(elo=BOT_ELO, mode="uci")
@@ -1,5 +1,8 @@
 # 06_generate_black_svg.py — Dessin via FEN live, historique via move_history.json (fallback txt), notation française
 
+import profilage
+profilage.activer("06_generate_black_svg")
+
 import os
 import re
 import json
@@ -8,6 +11,12 @@ import requests
 import chess.svg
 from pathlib import Path
 import cairosvg
+import cache_eval
+import archive_parties
+import journal_binaire
+import serveur_live
+import upload_miniature
+import ecriture_atomique
 
 # --- Fichiers ---
 DATA_DIR = Path("data")
@@ -58,10 +67,13 @@ def load_history_txt():
     except Exception:
         return []
 
-# --- Construire moves_san (FR) ---
-history = load_history_json()
+# --- Construire moves_san (FR) + FEN de chaque position (pour la courbe d'éval) ---
+# Journal binaire (écrit par reconciliation.py) si à jour, sinon le JSON
+coups_binaires = journal_binaire.charger_coups_rapide(MOVE_HISTORY_FILE)
+history = [{"coup": c} for c in coups_binaires] if coups_binaires is not None else load_history_json()
 board_tmp = chess.Board()
 moves_san, last_move_uci = [], None
+fens_historique = [board_tmp.fen()]
 
 if history:
     for entry in history:
@@ -71,6 +83,7 @@ if history:
             san_fr = san_to_french(san)
             moves_san.append(san_fr)
             board_tmp.push(move)
+            fens_historique.append(board_tmp.fen())
             last_move_uci = entry["coup"]
         except Exception:
             continue
@@ -83,6 +96,7 @@ else:
             san_fr = san_to_french(san)
             moves_san.append(san_fr)
             board_tmp.push(move)
+            fens_historique.append(board_tmp.fen())
             last_move_uci = uci
         except Exception:
             continue
@@ -166,15 +180,79 @@ def format_history_lines(moves, dernier):
         lignes.append(f'<tspan fill="red" font-weight="bold">{num}.</tspan> {coup_blanc} {coup_noir}')
     return [" ".join(lignes[j:j+5]) for j in range(0, len(lignes), 5)]
 
+# Lignes de 34 px à partir de y=370 dans le cadre (y=295 → 670) : 9 lignes au plus
+LIGNES_HISTORIQUE = 9
+
+def y_ligne(i):
+    return 370 + i * 34
+
 historique_lignes = format_history_lines(moves_san, moves_san[-1] if moves_san else "")
 if not historique_lignes:
     historique_lignes = ["(aucun coup pour le moment)"]
 
+# --- Barre d'éval + courbe d'historique (lecture du cache uniquement, jamais de moteur) ---
+EVAL_CACHE = cache_eval.charger_cache()
+
+def eval_bar_svg(entree, x=664, y=50, largeur=12, hauteur=620):
+    if not entree:
+        return ""
+    h_blancs = round(hauteur * cache_eval.fraction_blancs(entree["cp"]))
+    return (
+        f'<rect x="{x}" y="{y}" width="{largeur}" height="{hauteur}" fill="#1f2937"/>'
+        f'<rect x="{x}" y="{y + hauteur - h_blancs}" width="{largeur}" height="{h_blancs}" fill="#ffffff" stroke="#1f2937" stroke-width="1"/>'
+        f'<text x="{x + largeur / 2}" y="{y + hauteur + 18}" text-anchor="middle" font-size="13" font-family="Ubuntu" fill="#1f2937">{cache_eval.formater_eval(entree)}</text>'
+    )
+
+def eval_sparkline_svg(fens, x=900, y=255, largeur=350, hauteur=34):
+    points = []
+    n = len(fens)
+    for i, f in enumerate(fens):
+        entree = cache_eval.lire_eval(EVAL_CACHE, f)
+        if not entree:
+            continue
+        px = x + (largeur * i / (n - 1) if n > 1 else 0)
+        py = y + hauteur * (1 - cache_eval.fraction_blancs(entree["cp"]))
+        points.append(f"{px:.1f},{py:.1f}")
+    if len(points) < 2:
+        return ""
+    return (
+        f'<line x1="{x}" y1="{y + hauteur / 2}" x2="{x + largeur}" y2="{y + hauteur / 2}" stroke="#d1d5db" stroke-width="1"/>'
+        f'<polyline points="{" ".join(points)}" fill="none" stroke="#305080" stroke-width="2"/>'
+    )
+
+# --- Suggestions tirées des parties archivées (même position déjà atteinte) ---
+def suggestions_svg(board):
+    if board.turn != chess.WHITE or not archive_parties.ARCHIVE_DB.exists():
+        return ""
+    try:
+        conn = archive_parties.connecter()
+        try:
+            deja_joues = archive_parties.suggestions(conn, board)
+        finally:
+            conn.close()
+    except Exception as e:
+        print("⚠️ Lecture archive impossible:", e)
+        return ""
+    if not deja_joues:
+        return ""
+    coups = ", ".join(
+        f"{san_to_french(board.san(chess.Move.from_uci(uci)))} ×{n}" for uci, n in deja_joues.most_common(3)
+    )
+    # Dernière ligne du cadre, réservée (l'historique cède sa 9e ligne)
+    return f'<text x="693" y="{y_ligne(LIGNES_HISTORIQUE - 1)}" font-size="15" font-family="Ubuntu" fill="#555">Déjà vu dans vos parties : {coups}</text>'
+
+suggestions_archive = suggestions_svg(board)
+
+# Au-delà de la place disponible, seules les lignes les plus récentes sont affichées
+lignes_dispo = LIGNES_HISTORIQUE - (1 if suggestions_archive else 0)
 historique_svg = "".join(
-    f'<text x="700" y="{370+i*34}" font-size="15" font-family="Ubuntu" fill="#333">{ligne}</text>'
-    for i, ligne in enumerate(historique_lignes)
+    f'<text x="700" y="{y_ligne(i)}" font-size="15" font-family="Ubuntu" fill="#333">{ligne}</text>'
+    for i, ligne in enumerate(historique_lignes[-lignes_dispo:])
 )
 
+eval_bar = eval_bar_svg(cache_eval.lire_eval(EVAL_CACHE, board.fen()))
+eval_sparkline = eval_sparkline_svg(fens_historique)
+
 # --- SVG final ---
 svg_final = f"""<?xml version="1.0" encoding="UTF-8" standalone="no"?>
 <svg width="1280" height="720" xmlns="http://www.w3.org/2000/svg">
@@ -183,21 +261,34 @@ svg_final = f"""<?xml version="1.0" encoding="UTF-8" standalone="no"?>
   <text x="700" y="115" font-size="22" font-family="Ubuntu" fill="#1f2937">1. Postez votre coup en commentaire.</text>
   <text x="700" y="145" font-size="22" font-family="Ubuntu" fill="#1f2937">2. Le coup majoritaire sera joué automatiquement !</text>
   <g transform="translate(40,50)">{svg_echiquier}</g>
+  {eval_bar}
+  {eval_sparkline}
   <text x="700" y="200" font-size="26" font-family="Ubuntu" fill="#111">Dernier coup : {moves_san[-1] if moves_san else "(aucun)"}</text>
   <text x="700" y="240" font-size="28" font-family="Ubuntu" fill="#111">➤ Choisissez le prochain coup !</text>
   <text x="700" y="280" font-size="22" font-family="Ubuntu" fill="#555">Tour : {tour}</text>
   <rect x="680" y="295" width="580" height="375" fill="#fff" stroke="#d1d5db" stroke-width="1" rx="8" ry="8"/>
   <text x="693" y="330" font-size="24" font-family="Ubuntu" fill="#1f2937" font-weight="bold">☰ Historique des coups :</text>
   {historique_svg}
+  {suggestions_archive}
   <text x="750" y="700" font-size="25" font-family="Ubuntu" fill="#1f2937" font-weight="bold">Chaîne YOUTUBE : PriseEnPassant</text>
   <text x="50" y="40" font-size="22" font-family="Ubuntu" fill="#1f2937">♟️ {NOM_NOIRS}</text>
   <text x="50" y="700" font-size="22" font-family="Ubuntu" fill="#1f2937">♟️ {NOM_BLANCS}</text>
 </svg>"""
 
-SVG_FILE.write_text(svg_final, encoding="utf-8")
+ecriture_atomique.ecrire_texte(SVG_FILE, svg_final)
 print(f"✅ SVG généré : {SVG_FILE}")
 try:
-    cairosvg.svg2png(bytestring=svg_final.encode("utf-8"), write_to=str(PNG_FILE))
+    png_bytes = cairosvg.svg2png(bytestring=svg_final.encode("utf-8"))
+    ecriture_atomique.ecrire_octets(PNG_FILE, png_bytes)
     print(f"✅ PNG miniature générée : {PNG_FILE}")
+    serveur_live.publier("miniature", png_bytes)
 except Exception as e:
     print(f"❌ Erreur conversion PNG: {e}")
+    png_bytes = None
+
+# --- Upload YouTube directement depuis la mémoire (ignoré si l'image n'a pas changé) ---
+if png_bytes and os.getenv("UPLOAD_THUMBNAIL") == "1":
+    try:
+        upload_miniature.televerser_si_change(png_bytes)
+    except upload_miniature.ErreurUpload as e:
+        print(f"❌ Upload miniature: {e}")
@@ -1,40 +1,22 @@
 """
 Script pour uploader la miniature PNG sur YouTube.
 
-⚠️ Actuellement désactivé.
-Pour l’activer :
-1. Décommente le bloc de code principal
-2. Assure-toi que ton fichier .env contient les infos YouTube OAuth2
-3. Ajoute les dépendances nécessaires : google-api-python-client, google-auth-oauthlib
-"""
-
-# import os
-# from google.oauth2.credentials import Credentials
-# from googleapiclient.discovery import build
-# from config import YOUTUBE_VIDEO_ID, YOUTUBE_CLIENT_ID, YOUTUBE_CLIENT_SECRET, YOUTUBE_REFRESH_TOKEN, THUMBNAIL_PNG
-
-# def upload_thumbnail():
-#     if not os.path.exists(THUMBNAIL_PNG):
-#         print(f"❌ Miniature PNG introuvable : {THUMBNAIL_PNG}")
-#         return
+Normalement, 06_generate_black_svg.py envoie directement les octets PNG rendus
+(UPLOAD_THUMBNAIL=1). Ce script sert à renvoyer la miniature depuis le disque.
+L'upload est ignoré si l'image est identique au dernier envoi réussi.
 
-#     creds = Credentials(
-#         None,
-#         refresh_token=YOUTUBE_REFRESH_TOKEN,
-#         token_uri="https://oauth2.googleapis.com/token",
-#         client_id=YOUTUBE_CLIENT_ID,
-#         client_secret=YOUTUBE_CLIENT_SECRET,
-#         scopes=["https://www.googleapis.com/auth/youtube.upload"]
-#     )
-
-#     youtube = build("youtube", "v3", credentials=creds)
+Variables : YOUTUBE_VIDEO_ID, YOUTUBE_CLIENT_ID, YOUTUBE_CLIENT_SECRET, YOUTUBE_REFRESH_TOKEN.
+Test local : python stub_youtube.py 8900, puis
+    YOUTUBE_UPLOAD_BASE=http://localhost:8900 OAUTH_TOKEN_URI=http://localhost:8900/token python 07_upload_thumbnail.py
+"""
 
-#     request = youtube.thumbnails().set(
-#         videoId=YOUTUBE_VIDEO_ID,
-#         media_body=THUMBNAIL_PNG
-#     )
-#     response = request.execute()
-#     print(f"✅ Miniature mise à jour : {response}")
+from config import THUMBNAIL_PNG
+import upload_miniature
 
 if __name__ == "__main__":
-    print("🚫 Upload miniature désactivé. Décommente le code pour l'activer.")
+    if not THUMBNAIL_PNG.exists():
+        raise SystemExit(f"❌ Miniature PNG introuvable : {THUMBNAIL_PNG}")
+    try:
+        upload_miniature.televerser_si_change(THUMBNAIL_PNG.read_bytes())
+    except upload_miniature.ErreurUpload as e:
+        raise SystemExit(f"❌ {e}")
@@ -0,0 +1,176 @@
+# archive_parties.py — archive SQLite des parties communautaires terminées
+#
+# Quand 01_create_game.py démarre une nouvelle partie, la précédente est archivée ici
+# (coups, horodatages, votes, réglages du bot) avant la remise à zéro de data/.
+# Chaque position rencontrée est indexée par son hash Zobrist (python-chess polyglot),
+# ce qui permet de répondre en quelques millisecondes à « la communauté a-t-elle déjà
+# atteint cette position, et qu'a-t-elle voté ? ».
+#
+# Usage :
+#   python archive_parties.py archiver            archive la partie courante de data/
+#   python archive_parties.py chercher "<FEN>"    parties passées par cette position
+
+import json
+import sqlite3
+import sys
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+import chess
+import chess.polyglot
+
+DATA_DIR = Path("data")
+ARCHIVE_DB = DATA_DIR / "archive.sqlite3"
+GAME_ID_FILE = DATA_DIR / "game_id.txt"
+MOVE_HISTORY_FILE = DATA_DIR / "move_history.json"
+BOT_ELO_FILE = DATA_DIR / "bot_elo.txt"
+BOT_NAME_FILE = DATA_DIR / "bot_name.txt"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS parties (
+    id          INTEGER PRIMARY KEY,
+    game_id     TEXT UNIQUE NOT NULL,
+    debut       TEXT,
+    fin         TEXT,
+    archivee_le TEXT NOT NULL,
+    bot_elo     INTEGER,
+    bot_nom     TEXT,
+    resultat    TEXT,
+    nb_plies    INTEGER NOT NULL,
+    coups       TEXT NOT NULL,  -- UCI séparés par des espaces
+    horodatages TEXT NOT NULL   -- JSON : liste ISO, un par demi-coup
+);
+CREATE TABLE IF NOT EXISTS positions (
+    zobrist   INTEGER NOT NULL, -- hash Zobrist de la position AVANT le coup (signé 64 bits)
+    partie_id INTEGER NOT NULL REFERENCES parties(id) ON DELETE CASCADE,
+    ply       INTEGER NOT NULL,
+    coup      TEXT NOT NULL,    -- coup joué depuis cette position
+    votes     TEXT,             -- JSON {uci: nb} si la position était un vote communautaire
+    PRIMARY KEY (partie_id, ply)
+);
+CREATE INDEX IF NOT EXISTS idx_positions_zobrist ON positions(zobrist);
+"""
+
+
+def log(msg, type="info"):
+    icons = {"ok": "✅", "err": "❌", "warn": "⚠️", "info": "ℹ️", "find": "🔎", "save": "💾"}
+    print(f"{icons.get(type, '•')} {msg}")
+
+
+def zobrist_signe(board: chess.Board) -> int:
+    """Hash Zobrist 64 bits ramené dans la plage des INTEGER SQLite."""
+    h = chess.polyglot.zobrist_hash(board)
+    return h - (1 << 64) if h >= (1 << 63) else h
+
+
+def connecter(path: Path = ARCHIVE_DB) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path))
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def archiver_partie(conn, game_id, history, bot_elo=None, bot_nom=None, resultat=None):
+    """Archive une partie (remplace une archive existante du même game_id). Renvoie le nb de plies."""
+    board = chess.Board()
+    lignes = []
+    coups, horodatages = [], []
+    for ply, entry in enumerate(history):
+        try:
+            move = chess.Move.from_uci(entry["coup"])
+        except Exception:
+            log(f"Coup illisible au ply {ply + 1} — archive tronquée", "warn")
+            break
+        if move not in board.legal_moves:
+            log(f"Coup illégal {entry['coup']} au ply {ply + 1} — archive tronquée", "warn")
+            break
+        votes = entry.get("votes")
+        lignes.append((zobrist_signe(board), ply, entry["coup"], json.dumps(votes) if votes else None))
+        coups.append(entry["coup"])
+        horodatages.append(entry.get("horodatage"))
+        board.push(move)
+
+    if resultat is None and board.is_game_over():
+        resultat = board.result()
+
+    with conn:
+        conn.execute("DELETE FROM parties WHERE game_id = ?", (game_id,))
+        cur = conn.execute(
+            "INSERT INTO parties (game_id, debut, fin, archivee_le, bot_elo, bot_nom, resultat, nb_plies, coups, horodatages) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (game_id, horodatages[0] if horodatages else None, horodatages[-1] if horodatages else None,
+             datetime.now(timezone.utc).isoformat(), bot_elo, bot_nom, resultat,
+             len(coups), " ".join(coups), json.dumps(horodatages)),
+        )
+        partie_id = cur.lastrowid
+        conn.executemany(
+            "INSERT INTO positions (zobrist, partie_id, ply, coup, votes) VALUES (?, ?, ?, ?, ?)",
+            [(z, partie_id, ply, coup, votes) for z, ply, coup, votes in lignes],
+        )
+    return len(coups)
+
+
+def positions_connues(conn, board: chess.Board):
+    """Passages archivés par cette position : [{game_id, ply, coup, votes}]."""
+    rows = conn.execute(
+        "SELECT p.game_id, pos.ply, pos.coup, pos.votes FROM positions pos "
+        "JOIN parties p ON p.id = pos.partie_id WHERE pos.zobrist = ? ORDER BY p.id",
+        (zobrist_signe(board),),
+    ).fetchall()
+    return [
+        {"game_id": gid, "ply": ply, "coup": coup, "votes": json.loads(votes) if votes else None}
+        for gid, ply, coup, votes in rows
+    ]
+
+
+def suggestions(conn, board: chess.Board):
+    """Coups déjà joués depuis cette position (Counter uci → nb de parties)."""
+    return Counter(p["coup"] for p in positions_connues(conn, board))
+
+
+def archiver_partie_courante(path: Path = ARCHIVE_DB):
+    """Archive la partie décrite par data/ (appelé avant la remise à zéro)."""
+    if not GAME_ID_FILE.exists() or not MOVE_HISTORY_FILE.exists():
+        log("Aucune partie courante à archiver", "info")
+        return 0
+    game_id = GAME_ID_FILE.read_text(encoding="utf-8").strip()
+    try:
+        history = json.loads(MOVE_HISTORY_FILE.read_text(encoding="utf-8"))
+    except Exception as e:
+        log(f"move_history.json illisible ({e}) — archive ignorée", "warn")
+        return 0
+    if not game_id or not history:
+        log("Partie courante vide — rien à archiver", "info")
+        return 0
+
+    bot_elo = None
+    if BOT_ELO_FILE.exists():
+        try:
+            bot_elo = int(BOT_ELO_FILE.read_text(encoding="utf-8").strip())
+        except ValueError:
+            pass
+    bot_nom = BOT_NAME_FILE.read_text(encoding="utf-8").strip() if BOT_NAME_FILE.exists() else None
+
+    conn = connecter(path)
+    try:
+        n = archiver_partie(conn, game_id, history, bot_elo=bot_elo, bot_nom=bot_nom)
+    finally:
+        conn.close()
+    log(f"Partie {game_id} archivée ({n} demi-coups) dans {path}", "save")
+    return n
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args[:1] == ["archiver"]:
+        archiver_partie_courante()
+    elif args[:1] == ["chercher"] and len(args) == 2:
+        conn = connecter()
+        for p in positions_connues(conn, chess.Board(args[1])):
+            votes = f" votes={p['votes']}" if p["votes"] else ""
+            print(f"{p['game_id']} ply {p['ply'] + 1}: {p['coup']}{votes}")
+        conn.close()
+    else:
+        raise SystemExit('Usage : python archive_parties.py archiver | chercher "<FEN>"')
@@ -0,0 +1,98 @@
+# bench_journal_binaire.py — taille et temps de chargement : move_history.json vs journal binaire
+#
+# Usage : python bench_journal_binaire.py
+# Pour 100, 500 et 2000 demi-coups : taille des deux formats, temps pour obtenir
+# la position au dernier demi-coup et à mi-partie, et temps de décodage complet.
+
+import json
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import chess
+
+import journal_binaire
+
+TAILLES = [100, 500, 2000]
+REPETITIONS = 20
+
+
+def historique_synthetique(n: int, seed: int = 1):
+    """Partie aléatoire de n demi-coups (jamais de mat/pat avant la fin), au format move_history.json."""
+    rng = random.Random(seed)
+    board = chess.Board()
+    t = datetime(2025, 8, 31, 18, 0, tzinfo=timezone.utc)
+    history = []
+    for _ in range(n):
+        coups = list(board.legal_moves)
+        rng.shuffle(coups)
+        for mv in coups:
+            board.push(mv)
+            if any(board.legal_moves):
+                break
+            board.pop()
+        t += timedelta(seconds=rng.randrange(20, 900), microseconds=rng.randrange(1_000_000))
+        history.append({
+            "couleur": "noir" if board.turn == chess.WHITE else "blanc",
+            "coup": board.peek().uci(),
+            "fen_apres": board.fen(),
+            "horodatage": t.isoformat(),
+        })
+    return history
+
+
+def chrono(fn):
+    debut = time.perf_counter()
+    for _ in range(REPETITIONS):
+        fn()
+    return (time.perf_counter() - debut) / REPETITIONS * 1000
+
+
+def position_json(path: Path, n: int):
+    history = json.loads(path.read_text(encoding="utf-8"))
+    board = chess.Board()
+    for entry in history[:n]:
+        board.push(chess.Move.from_uci(entry["coup"]))
+    return board
+
+
+def position_bin(path: Path, n: int):
+    with journal_binaire.JournalBinaire(path) as j:
+        return j.position(n)
+
+
+def coups_json(path: Path):
+    return [e["coup"] for e in json.loads(path.read_text(encoding="utf-8"))]
+
+
+def coups_bin(path: Path):
+    with journal_binaire.JournalBinaire(path) as j:
+        return j.coups()
+
+
+def decodage_bin(path: Path):
+    with journal_binaire.JournalBinaire(path) as j:
+        return j.vers_json()
+
+
+if __name__ == "__main__":
+    tmp = Path(tempfile.mkdtemp())
+    print(f"{'plies':>6} {'JSON (o)':>10} {'bin (o)':>9} {'ratio':>6} "
+          f"{'pos N json':>11} {'pos N bin':>10} {'pos N/2 bin':>12} {'coups json':>11} {'coups bin':>10} {'décodage bin':>13}  (ms)")
+    for n in TAILLES:
+        history = historique_synthetique(n)
+        json_path, bin_path = tmp / f"h{n}.json", tmp / f"h{n}.bin"
+        json_path.write_text(json.dumps(history, ensure_ascii=False, indent=2), encoding="utf-8")
+        journal_binaire.depuis_json(json_path, bin_path)
+        assert decodage_bin(bin_path) == history, "conversion non réversible"
+
+        taille_json, taille_bin = json_path.stat().st_size, bin_path.stat().st_size
+        print(f"{n:>6} {taille_json:>10} {taille_bin:>9} {taille_json / taille_bin:>5.1f}x "
+              f"{chrono(lambda: position_json(json_path, n)):>11.2f} "
+              f"{chrono(lambda: position_bin(bin_path, n)):>10.2f} "
+              f"{chrono(lambda: position_bin(bin_path, n // 2)):>12.2f} "
+              f"{chrono(lambda: coups_json(json_path)):>11.2f} "
+              f"{chrono(lambda: coups_bin(bin_path)):>10.2f} "
+              f"{chrono(lambda: decodage_bin(bin_path)):>13.2f}")
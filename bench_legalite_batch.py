@@ -0,0 +1,102 @@
+# bench_legalite_batch.py — extraire_coups_valides (un commentaire à la fois) vs API en lot
+#
+# Usage : python bench_legalite_batch.py [nb_positions] [commentaires_par_position]
+# Génère des positions et des flux de commentaires réalistes (SAN, UCI, français,
+# bruit), vérifie que les deux chemins donnent les mêmes coups, puis compare les temps.
+
+import contextlib
+import importlib.util
+import io
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+import chess
+
+# 03 exige ses secrets à l'import : valeurs factices, aucun appel réseau n'est fait ici
+for var in ("YOUTUBE_API_KEY", "YOUTUBE_VIDEO_ID", "LICHESS_BOT_TOKEN"):
+    os.environ.setdefault(var, "bench")
+_spec = importlib.util.spec_from_file_location("process_comments", Path(__file__).with_name("03_process_comments.py"))
+process_comments = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(process_comments)
+
+FR = {"N": "C", "B": "F", "R": "T", "Q": "D", "K": "R"}
+
+
+def positions(n: int, rng):
+    fens = []
+    while len(fens) < n:
+        board = chess.Board()
+        for _ in range(rng.randrange(0, 60)):
+            if board.is_game_over():
+                break
+            board.push(rng.choice(list(board.legal_moves)))
+        if not board.is_game_over():
+            fens.append(board.fen())
+    return fens
+
+
+def commentaires(fen: str, n: int, rng):
+    board = chess.Board(fen)
+    coups = list(board.legal_moves)
+    favoris = rng.sample(coups, min(3, len(coups)))  # les votes se concentrent sur quelques coups
+    sortie = []
+    for _ in range(n):
+        mv = rng.choice(favoris) if rng.random() < 0.8 else rng.choice(coups)
+        san = board.san(mv)
+        forme = rng.random()
+        if forme < 0.5:
+            sortie.append(san)
+        elif forme < 0.7:
+            sortie.append(mv.uci())
+        elif forme < 0.85:
+            sortie.append(FR.get(san[0], "") + san[1:] if san[0] in FR else san)
+        elif forme < 0.95:
+            sortie.append(f"je vote {san} !")
+        else:
+            sortie.append(rng.choice(["gg", "Nf9", "allez", "e9", "roque", "e4 e4 !", "a1a1"]))
+    return sortie
+
+
+def boucle_par_commentaire(fens, flux_par_position):
+    resultats = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for fen, coms in zip(fens, flux_par_position):
+            resultats.append(process_comments.extraire_coups_valides(chess.Board(fen), coms))
+    return resultats
+
+
+def lot(fens, flux_par_position):
+    flux = [(i, c) for i, coms in enumerate(flux_par_position) for c in coms]
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, coups, _ = process_comments.extraire_coups_valides_batch(fens, flux)
+    resultats = [[] for _ in fens]
+    for (i, _), uci in zip(flux, coups):
+        if uci:
+            resultats[i].append(uci)
+    return resultats
+
+
+if __name__ == "__main__":
+    nb_positions = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    par_position = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rng = random.Random(7)
+    fens = positions(nb_positions, rng)
+    flux = [commentaires(fen, par_position, rng) for fen in fens]
+
+    debut = time.perf_counter()
+    attendu = boucle_par_commentaire(fens, flux)
+    t_boucle = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    obtenu = lot(fens, flux)
+    t_lot = time.perf_counter() - debut
+
+    assert obtenu == attendu, "résultats différents entre la boucle et le lot"
+    total = nb_positions * par_position
+    print(f"{nb_positions} positions × {par_position} commentaires = {total} paires")
+    print(f"boucle par commentaire : {t_boucle * 1000:8.1f} ms ({t_boucle / total * 1e6:6.1f} µs/paire)")
+    print(f"API en lot             : {t_lot * 1000:8.1f} ms ({t_lot / total * 1e6:6.1f} µs/paire)")
+    print(f"accélération           : {t_boucle / t_lot:6.1f}x")
@@ -0,0 +1,65 @@
+# bench_niveau_bot.py — temps moteur par coup : mode skill (MultiPV) vs depth / UCI_Elo
+#
+# Usage : python bench_niveau_bot.py [nb_positions]
+# Joue un coup noir sur un échantillon de positions pour chaque configuration,
+# exactement comme le script du bot (run_bot.yml), et affiche le temps moyen par coup.
+
+import random
+import shutil
+import statistics
+import sys
+import time
+
+import chess
+import chess.engine
+
+import niveau_bot
+
+CONFIGS = [
+    ("depth 1", "depth", 1),
+    ("depth 2", "depth", 2),
+    ("depth 3", "depth", 3),
+    ("uci 1320", "uci", 1320),
+    ("uci 1500", "uci", 1500),
+    ("skill 300", "skill", 300),
+    ("skill 800", "skill", 800),
+    ("skill 1100", "skill", 1100),
+]
+
+
+def positions_echantillon(n: int, seed: int = 42):
+    """Positions aux Noirs de jouer, tirées de parties aléatoires (8 à 40 demi-coups)."""
+    rng = random.Random(seed)
+    fens = []
+    while len(fens) < n:
+        board = chess.Board()
+        for _ in range(rng.randrange(8, 40)):
+            if board.is_game_over():
+                break
+            board.push(rng.choice(list(board.legal_moves)))
+        if board.turn == chess.BLACK and not board.is_game_over():
+            fens.append(board.fen())
+    return fens
+
+
+if __name__ == "__main__":
+    stockfish_path = shutil.which("stockfish")
+    if not stockfish_path:
+        raise SystemExit("❌ Stockfish introuvable")
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    fens = positions_echantillon(n)
+
+    print(f"{'configuration':<12} {'moy (ms)':>10} {'médiane':>10} {'max':>10}")
+    for nom, mode, valeur in CONFIGS:
+        # Moteur neuf par configuration : UCI_LimitStrength ne doit pas déborder sur la suivante
+        engine = chess.engine.SimpleEngine.popen_uci(stockfish_path)
+        durees = []
+        try:
+            for fen in fens:
+                board = chess.Board(fen)
+                debut = time.perf_counter()
+                niveau_bot.jouer_coup(engine, board, mode, valeur)
+                durees.append((time.perf_counter() - debut) * 1000)
+        finally:
+            engine.quit()
+        print(f"{nom:<12} {statistics.mean(durees):>10.1f} {statistics.median(durees):>10.1f} {max(durees):>10.1f}")
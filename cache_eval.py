@@ -0,0 +1,199 @@
+# cache_eval.py — cache persistant des évaluations Stockfish (clé : FEN + profondeur)
+#
+# Le rendu (06) lit uniquement ce cache et ne lance jamais le moteur.
+# Le cache est rempli :
+#   - par le script du bot (run_bot.yml) avec le score de sa propre recherche ;
+#   - en tâche de fond pendant la fenêtre de vote (`python cache_eval.py --remplir`),
+#     qui analyse la position courante et toutes les positions atteignables
+#     par un coup blanc, pour que l'éval du coup voté soit prête au rendu suivant.
+#
+# Le fichier est commité à chaque coup : le remplissage l'élague aux positions de la
+# partie en cours (move_history.json) et aux réponses blanches de la position courante.
+
+import json
+import shutil
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import ecriture_atomique
+
+DATA_DIR = Path("data")
+EVAL_CACHE_FILE = DATA_DIR / "eval_cache.json"
+POSITION_FILE = DATA_DIR / "position.fen"
+MOVE_HISTORY_FILE = DATA_DIR / "move_history.json"
+FEN_DEPART = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq -"
+
+# Bornes de la barre d'éval (en centipions, point de vue des Blancs)
+MATE_CP = 10000
+BAR_CLAMP_CP = 1000
+
+
+def log(msg, type="info"):
+    icons = {"ok": "✅", "err": "❌", "warn": "⚠️", "info": "ℹ️", "save": "💾", "find": "🔎"}
+    print(f"{icons.get(type, '•')} {msg}")
+
+
+def cle_fen(fen: str) -> str:
+    """Normalise une FEN en ignorant les compteurs de demi-coups / coups."""
+    return " ".join(fen.split()[:4])
+
+
+def charger_cache(path: Path = EVAL_CACHE_FILE) -> dict:
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return data if isinstance(data, dict) else {}
+    except Exception as e:
+        log(f"Erreur lecture {path} : {e} → cache vide", "warn")
+        return {}
+
+
+def sauvegarder_cache(cache: dict, path: Path = EVAL_CACHE_FILE):
+    ecriture_atomique.ecrire_texte(path, json.dumps(cache, ensure_ascii=False, sort_keys=True))
+
+
+def positions_partie(path: Path = MOVE_HISTORY_FILE) -> set:
+    """Clés de cache des positions de la partie en cours (position initiale incluse)."""
+    cles = {FEN_DEPART}
+    try:
+        history = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return cles
+    for entree in history if isinstance(history, list) else []:
+        if entree.get("fen_apres"):
+            cles.add(cle_fen(entree["fen_apres"]))
+    return cles
+
+
+def fusionner_et_sauvegarder(nouvelles: dict, path: Path = EVAL_CACHE_FILE, garder: set = None):
+    """
+    Relit le cache sous verrou et y ajoute `nouvelles`. Si `garder` est fourni, seules
+    ces clés (et les nouvelles) sont conservées : le reste est élagué.
+    """
+    with ecriture_atomique.verrou():
+        cache = charger_cache(path)
+        if garder is not None:
+            avant = len(cache)
+            cache = {cle: v for cle, v in cache.items() if cle in garder or cle in nouvelles}
+            if len(cache) < avant:
+                log(f"{avant - len(cache)} position(s) hors partie élaguée(s) du cache", "info")
+        for cle, par_profondeur in nouvelles.items():
+            cache.setdefault(cle, {}).update(par_profondeur)
+        sauvegarder_cache(cache, path)
+
+
+def lire_eval(cache: dict, fen: str, profondeur_min: int = 0):
+    """
+    Renvoie l'entrée la plus profonde connue pour cette FEN (profondeur >= profondeur_min),
+    ou None. Une entrée : {"cp": int, "mate": int|None, "source": str, "horodatage": str}.
+    """
+    par_profondeur = cache.get(cle_fen(fen))
+    if not par_profondeur:
+        return None
+    profondeurs = [int(d) for d in par_profondeur if int(d) >= profondeur_min]
+    if not profondeurs:
+        return None
+    return par_profondeur[str(max(profondeurs))]
+
+
+def enregistrer_eval(cache: dict, fen: str, profondeur: int, cp=None, mate=None, source="analyse"):
+    """Ajoute une éval (point de vue des Blancs). Une éval mat prime sur les centipions."""
+    if mate is not None:
+        cp = MATE_CP if mate > 0 else -MATE_CP
+    if cp is None:
+        return
+    cache.setdefault(cle_fen(fen), {})[str(int(profondeur))] = {
+        "cp": int(cp),
+        "mate": mate,
+        "source": source,
+        "horodatage": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def enregistrer_score(cache: dict, fen: str, info: dict, source="analyse"):
+    """Enregistre le `score`/`depth` d'un dict info python-chess (engine.analyse / engine.play)."""
+    score = info.get("score")
+    depth = info.get("depth")
+    if score is None or not depth:
+        return
+    blanc = score.white()
+    enregistrer_eval(cache, fen, depth, cp=blanc.score(), mate=blanc.mate(), source=source)
+
+
+def fraction_blancs(cp: int) -> float:
+    """Part de la barre occupée par les Blancs (0.0 → 1.0)."""
+    cp = max(-BAR_CLAMP_CP, min(BAR_CLAMP_CP, cp))
+    return 0.5 + cp / (2 * BAR_CLAMP_CP)
+
+
+def formater_eval(entree) -> str:
+    if not entree:
+        return "?"
+    if entree.get("mate") is not None:
+        return f"M{abs(entree['mate'])}" if entree["mate"] > 0 else f"-M{abs(entree['mate'])}"
+    return f"{entree['cp'] / 100:+.1f}"
+
+
+# -----------------------
+# Remplissage en tâche de fond
+# -----------------------
+def remplir_cache(fen: str, profondeur: int = 16, budget_s: float = 60.0):
+    """
+    Analyse la position puis chaque position issue d'un coup légal, dans la limite
+    du budget. Les positions déjà connues à cette profondeur sont sautées.
+    """
+    import chess
+    import chess.engine
+
+    stockfish_path = shutil.which("stockfish")
+    if not stockfish_path:
+        log("Stockfish introuvable — remplissage du cache ignoré", "warn")
+        return 0
+
+    cache = charger_cache()
+    board = chess.Board(fen)
+    positions = [board.fen()]
+    for mv in board.legal_moves:
+        board.push(mv)
+        positions.append(board.fen())
+        board.pop()
+
+    debut = time.monotonic()
+    ajoutees = 0
+    nouvelles = {}
+    engine = chess.engine.SimpleEngine.popen_uci(stockfish_path)
+    try:
+        for pos in positions:
+            if time.monotonic() - debut > budget_s:
+                log(f"Budget de {budget_s:.0f}s atteint", "warn")
+                break
+            if lire_eval(cache, pos, profondeur):
+                continue
+            b = chess.Board(pos)
+            if b.is_game_over():
+                continue
+            info = engine.analyse(b, chess.engine.Limit(depth=profondeur))
+            enregistrer_score(nouvelles, pos, info, source="remplissage")
+            ajoutees += 1
+    finally:
+        engine.quit()
+
+    # Relu sous verrou : une autre écriture locale a pu survenir pendant l'analyse
+    garder = positions_partie() | {cle_fen(p) for p in positions}
+    fusionner_et_sauvegarder(nouvelles, garder=garder)
+    log(f"{ajoutees} éval(s) ajoutée(s) au cache ({len(positions)} position(s) visée(s))", "save")
+    return ajoutees
+
+
+if __name__ == "__main__":
+    if "--remplir" not in sys.argv:
+        raise SystemExit("Usage : python cache_eval.py --remplir [profondeur] [budget_s]")
+    args = [a for a in sys.argv[1:] if a != "--remplir"]
+    profondeur = int(args[0]) if len(args) > 0 else 16
+    budget = float(args[1]) if len(args) > 1 else 60.0
+    if not POSITION_FILE.exists():
+        raise SystemExit("❌ position.fen introuvable.")
+    remplir_cache(POSITION_FILE.read_text(encoding="utf-8").strip(), profondeur, budget)
@@ -14,6 +14,7 @@ BOT_USERNAME = os.getenv("BOT_USERNAME")
 YOUTUBE_CHANNEL_ID = os.getenv("YOUTUBE_CHANNEL_ID")
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 YOUTUBE_VIDEO_ID = os.getenv("YOUTUBE_VIDEO_ID")
+YOUTUBE_VIDEO_IDS = os.getenv("YOUTUBE_VIDEO_IDS", "")  # vidéos/Shorts supplémentaires, séparés par des virgules
 
 # OAuth 2.0
 YOUTUBE_CLIENT_ID = os.getenv("YOUTUBE_CLIENT_ID")
@@ -26,6 +27,7 @@ POSITION_FILE = DATA_DIR / "position.fen"
 LAST_MOVE_FILE = DATA_DIR / "dernier_coup.json"
 COUP_BLANCS_FILE = DATA_DIR / "coup_blanc.txt"
 MOVE_HISTORY_FILE = DATA_DIR / "move_history.json"  # ✅ ajouté
+THUMBNAIL_PNG = DATA_DIR / "thumbnail_black.png"
 
 # Alias pour compatibilité
 FEN_FILE = POSITION_FILE
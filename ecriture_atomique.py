@@ -0,0 +1,119 @@
+# ecriture_atomique.py — écritures atomiques de data/ sous verrou consultatif
+#
+# Une exécution annulée (cancel-in-progress) ou tuée en pleine écriture ne doit jamais
+# laisser un fichier d'état tronqué :
+#
+#   - chaque écriture passe par un fichier temporaire du même dossier, fsync, puis
+#     os.replace (rename atomique) et fsync du dossier ;
+#   - un verrou flock exclusif (data/.lock) sérialise les écrivains d'une même machine
+#     (processus en parallèle, serveur live, exécution locale), avec timeout ;
+#   - `verrou()` est réentrant : on l'englobe autour d'une lecture-modification-écriture
+#     (ajout à move_history.json) ou de plusieurs fichiers qui doivent changer ensemble ;
+#   - `verrou(partage=True)` donne aux lecteurs un instantané cohérent de plusieurs fichiers.
+#
+# Le verrou ne couvre pas deux workflows GitHub Actions : chacun tourne sur son propre
+# runner, avec sa propre copie de data/. Ces conflits restent réglés au push par
+# `git pull --rebase`.
+#
+# Le temps d'attente du verrou est cumulé dans STATS (voir stress_ecriture.py).
+
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+LOCK_FILE = Path(os.getenv("DATA_LOCK_FILE", "data/.lock"))
+TIMEOUT_S = float(os.getenv("DATA_LOCK_TIMEOUT", "30"))
+ATTENTE_SIGNALEE_S = 1.0
+
+STATS = {"acquisitions": 0, "attente_totale_s": 0.0, "attente_max_s": 0.0}
+
+_local = threading.local()
+_mutex = threading.Lock()
+
+
+class VerrouIndisponible(TimeoutError):
+    pass
+
+
+@contextmanager
+def verrou(partage: bool = False, timeout: float = None):
+    """Verrou consultatif sur data/.lock (exclusif par défaut), réentrant dans un même thread."""
+    if getattr(_local, "profondeur", 0):
+        _local.profondeur += 1
+        try:
+            yield
+        finally:
+            _local.profondeur -= 1
+        return
+
+    timeout = TIMEOUT_S if timeout is None else timeout
+    LOCK_FILE.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+    mode = fcntl.LOCK_SH if partage else fcntl.LOCK_EX
+    debut = time.monotonic()
+    pause = 0.001
+    try:
+        while True:
+            try:
+                fcntl.flock(fd, mode | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() - debut > timeout:
+                    raise VerrouIndisponible(f"Verrou {LOCK_FILE} indisponible après {timeout:.0f}s")
+                time.sleep(pause)
+                pause = min(pause * 2, 0.05)
+
+        attente = time.monotonic() - debut
+        with _mutex:
+            STATS["acquisitions"] += 1
+            STATS["attente_totale_s"] += attente
+            STATS["attente_max_s"] = max(STATS["attente_max_s"], attente)
+        if attente > ATTENTE_SIGNALEE_S:
+            print(f"⚠️ Verrou {LOCK_FILE} obtenu après {attente:.1f}s d'attente")
+
+        _local.profondeur = 1
+        try:
+            yield
+        finally:
+            _local.profondeur = 0
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
+def ecrire_octets(path, data: bytes):
+    """Remplace `path` atomiquement par `data` (temp + fsync + rename), sous verrou."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with verrou():
+        fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+        dfd = os.open(path.parent, os.O_RDONLY)
+        try:
+            os.fsync(dfd)
+        finally:
+            os.close(dfd)
+
+
+def ecrire_texte(path, texte: str):
+    ecrire_octets(path, texte.encode("utf-8"))
+
+
+def ecrire_json(path, data, indent=2):
+    ecrire_texte(path, json.dumps(data, ensure_ascii=False, indent=indent))
@@ -0,0 +1,305 @@
+# journal_binaire.py — format binaire compact de move_history.json, accès direct à tout demi-coup
+#
+# Disposition (little-endian) :
+#   en-tête   "MHB1" | u8 version | u8 réservé | u16 intervalle K | u32 nb_plies
+#             | u32 nb_checkpoints | i64 t0 (µs epoch) | u32 off_plies | u32 off_index
+#             | u32 off_extras | u32 len_extras | 20o SHA-1 du JSON source (zéros si inconnu)
+#   plies     nb_plies × 8 octets : u16 coup | i48 delta horodatage (µs, vs ply précédent)
+#   index     nb_checkpoints × 16 octets : u32 offset FEN | u32 longueur FEN | i64 horodatage absolu
+#   FEN       position après j×K demi-coups (j = 0 → position de départ), ASCII
+#   extras    JSON {ply: {clé: valeur}} pour tout ce qui ne se déduit pas du reste
+#             (fen_apres incohérente, horodatage non canonique, votes, source…)
+#
+# Coup sur 16 bits : from (6) | to (6) << 6 | pièce de promotion (2) << 12 | promotion (1) << 14.
+# Le demi-coup i est à off_plies + 8·i (O(1)) ; la position après i demi-coups se
+# reconstruit depuis le checkpoint ⌊i/K⌋ en rejouant au plus K-1 coups.
+# Le SHA-1 du JSON source dit si le binaire est à jour (les mtimes posés par git
+# checkout / rebase ne disent rien du contenu).
+#
+# Usage :
+#   python journal_binaire.py encoder [move_history.json] [move_history.bin]
+#   python journal_binaire.py decoder [move_history.bin] [move_history.json]
+
+import hashlib
+import json
+import mmap
+import struct
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import chess
+
+import ecriture_atomique
+
+MOVE_HISTORY_FILE = Path("data/move_history.json")
+MOVE_HISTORY_BIN = Path("data/move_history.bin")
+
+MAGIC = b"MHB1"
+VERSION = 2
+INTERVALLE_CHECKPOINT = 32
+HEADER = struct.Struct("<4sBBHIIqIIII20s")
+EMPREINTE_VIDE = bytes(20)
+CHECKPOINT = struct.Struct("<IIq")
+TAILLE_PLY = 8
+CLES_STANDARD = ("couleur", "coup", "fen_apres", "horodatage")
+PROMOTIONS = [chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN]
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def encoder_coup(move: chess.Move) -> int:
+    code = move.from_square | (move.to_square << 6)
+    if move.promotion:
+        code |= (PROMOTIONS.index(move.promotion) << 12) | (1 << 14)
+    return code
+
+
+def decoder_coup(code: int) -> chess.Move:
+    promo = PROMOTIONS[(code >> 12) & 3] if code & (1 << 14) else None
+    return chess.Move(code & 63, (code >> 6) & 63, promotion=promo)
+
+
+def iso_vers_us(ts: str) -> int:
+    dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    delta = dt - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def us_vers_iso(us: int) -> str:
+    return (EPOCH + timedelta(microseconds=us)).isoformat()
+
+
+def _i48(valeur: int) -> bytes:
+    return (valeur & ((1 << 48) - 1)).to_bytes(6, "little")
+
+
+def _lire_i48(buf) -> int:
+    v = int.from_bytes(buf, "little")
+    return v - (1 << 48) if v >= (1 << 47) else v
+
+
+# -----------------------
+# Écriture
+# -----------------------
+def empreinte_json(data: bytes) -> bytes:
+    return hashlib.sha1(data).digest()
+
+
+def _horodatage_canonique(ts):
+    """µs epoch si l'aller-retour µs → ISO redonne exactement `ts`, sinon None (→ extras)."""
+    if not isinstance(ts, str):
+        return None
+    try:
+        us = iso_vers_us(ts)
+    except (ValueError, TypeError):  # TypeError : datetime naïf (sans décalage)
+        return None
+    return us if us_vers_iso(us) == ts else None
+
+
+def encoder(history, fen_depart: str = chess.STARTING_FEN, intervalle: int = INTERVALLE_CHECKPOINT,
+            empreinte: bytes = EMPREINTE_VIDE) -> bytes:
+    board = chess.Board(fen_depart)
+    plies = bytearray()
+    fens = [board.fen()]
+    temps_checkpoints = []
+    extras = {}
+    horodatages = [_horodatage_canonique(e.get("horodatage")) for e in history]
+    # Repli des horodatages non canoniques avant le premier canonique : ce dernier (et
+    # non 0), pour que les deltas restent dans les 48 bits
+    t0 = next((us for us in horodatages if us is not None), 0)
+    precedent = None
+
+    for i, entry in enumerate(history):
+        move = chess.Move.from_uci(entry["coup"])
+        couleur_attendue = "blanc" if board.turn == chess.WHITE else "noir"
+        board.push(move)
+
+        us = horodatages[i]
+        if us is None:
+            us = precedent if precedent is not None else t0
+            extras.setdefault(i, {})["horodatage"] = entry.get("horodatage")
+        delta = us - (precedent if precedent is not None else t0)
+        precedent = us
+
+        if i % intervalle == 0:
+            temps_checkpoints.append(us)  # horodatage du ply j×K (début du bloc)
+
+        plies += struct.pack("<H", encoder_coup(move)) + _i48(delta)
+
+        # Tout ce qui ne se déduit pas du coup part dans les extras
+        if entry.get("couleur") != couleur_attendue:
+            extras.setdefault(i, {})["couleur"] = entry.get("couleur")
+        if entry.get("fen_apres") != board.fen():
+            extras.setdefault(i, {})["fen_apres"] = entry.get("fen_apres")
+        for k, v in entry.items():
+            if k not in CLES_STANDARD:
+                extras.setdefault(i, {})[k] = v
+        for k in CLES_STANDARD:
+            if k not in entry:
+                extras.setdefault(i, {}).setdefault("_absentes", []).append(k)
+
+        if (i + 1) % intervalle == 0:
+            fens.append(board.fen())
+
+    n = len(history)
+    nb_checkpoints = len(fens)
+    temps_checkpoints += [precedent or 0] * (nb_checkpoints - len(temps_checkpoints))
+    off_plies = HEADER.size
+    off_index = off_plies + len(plies)
+    off_fens = off_index + nb_checkpoints * CHECKPOINT.size
+    index = bytearray()
+    fens_bin = bytearray()
+    for fen, t in zip(fens, temps_checkpoints):
+        data = fen.encode("ascii")
+        index += CHECKPOINT.pack(off_fens + len(fens_bin), len(data), t)
+        fens_bin += data
+    extras_bin = json.dumps({str(k): v for k, v in extras.items()}, ensure_ascii=False, separators=(",", ":")).encode("utf-8") if extras else b""
+    off_extras = off_fens + len(fens_bin)
+
+    header = HEADER.pack(MAGIC, VERSION, 0, intervalle, n, nb_checkpoints, t0 or 0,
+                         off_plies, off_index, off_extras, len(extras_bin), empreinte)
+    return bytes(header + plies + index + fens_bin + extras_bin)
+
+
+def depuis_json(json_path: Path = MOVE_HISTORY_FILE, bin_path: Path = MOVE_HISTORY_BIN):
+    brut = json_path.read_bytes()
+    history = json.loads(brut.decode("utf-8"))
+    ecriture_atomique.ecrire_octets(bin_path, encoder(history, empreinte=empreinte_json(brut)))
+    return len(history)
+
+
+# -----------------------
+# Lecture (mmap)
+# -----------------------
+class JournalBinaire:
+    def __init__(self, path: Path = MOVE_HISTORY_BIN):
+        self._f = open(path, "rb")
+        self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, _, self.intervalle, self.nb_plies, self.nb_checkpoints, self.t0,
+         self._off_plies, self._off_index, self._off_extras, self._len_extras,
+         self.empreinte) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.fermer()
+            raise ValueError(f"{path} n'est pas un journal binaire v{VERSION}")
+        self._extras = None
+
+    def fermer(self):
+        self._mm.close()
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+    def __len__(self):
+        return self.nb_plies
+
+    @property
+    def extras(self) -> dict:
+        if self._extras is None:
+            brut = self._mm[self._off_extras:self._off_extras + self._len_extras]
+            self._extras = {int(k): v for k, v in json.loads(brut).items()} if brut else {}
+        return self._extras
+
+    def _ply(self, i: int):
+        if not 0 <= i < self.nb_plies:
+            raise IndexError(i)
+        off = self._off_plies + TAILLE_PLY * i
+        (code,) = struct.unpack_from("<H", self._mm, off)
+        return code, _lire_i48(self._mm[off + 2:off + 8])
+
+    def _checkpoint(self, j: int):
+        off, longueur, t = CHECKPOINT.unpack_from(self._mm, self._off_index + CHECKPOINT.size * j)
+        return self._mm[off:off + longueur].decode("ascii"), t
+
+    def coup(self, i: int) -> str:
+        return decoder_coup(self._ply(i)[0]).uci()
+
+    def coups(self) -> list:
+        """Tous les coups UCI, sans rejouer la partie."""
+        fin = self._off_plies + TAILLE_PLY * self.nb_plies
+        return [decoder_coup(code).uci() for code, _ in struct.iter_unpack("<H6s", self._mm[self._off_plies:fin])]
+
+    def horodatage_us(self, i: int) -> int:
+        j = i // self.intervalle
+        _, t = self._checkpoint(j)
+        for k in range(j * self.intervalle + 1, i + 1):
+            t += self._ply(k)[1]
+        return t
+
+    def position(self, n: int) -> chess.Board:
+        """Position après n demi-coups (0 ≤ n ≤ nb_plies)."""
+        if not 0 <= n <= self.nb_plies:
+            raise IndexError(n)
+        j = min(n // self.intervalle, self.nb_checkpoints - 1)
+        board = chess.Board(self._checkpoint(j)[0])
+        for k in range(j * self.intervalle, n):
+            board.push(decoder_coup(self._ply(k)[0]))
+        return board
+
+    def _construire_entree(self, i: int, move: chess.Move, board_apres: chess.Board, t_us: int) -> dict:
+        extra = self.extras.get(i, {})
+        entry = {
+            "couleur": "noir" if board_apres.turn == chess.WHITE else "blanc",
+            "coup": move.uci(),
+            "fen_apres": board_apres.fen(),
+            "horodatage": us_vers_iso(t_us),
+        }
+        entry.update({k: v for k, v in extra.items() if k != "_absentes"})
+        for k in extra.get("_absentes", []):
+            entry.pop(k, None)
+        return entry
+
+    def entree(self, i: int) -> dict:
+        """Entrée JSON équivalente à move_history.json[i]."""
+        return self._construire_entree(i, decoder_coup(self._ply(i)[0]), self.position(i + 1), self.horodatage_us(i))
+
+    def vers_json(self) -> list:
+        """Décodage complet en un seul rejeu (O(n))."""
+        history = []
+        board = chess.Board(self._checkpoint(0)[0])
+        t = self.t0
+        for i in range(self.nb_plies):
+            code, delta = self._ply(i)
+            t = t + delta if i else self.t0
+            move = decoder_coup(code)
+            board.push(move)
+            history.append(self._construire_entree(i, move, board, t))
+        return history
+
+
+def vers_json(bin_path: Path = MOVE_HISTORY_BIN, json_path: Path = MOVE_HISTORY_FILE):
+    with JournalBinaire(bin_path) as j:
+        history = j.vers_json()
+    ecriture_atomique.ecrire_json(json_path, history)
+    return len(history)
+
+
+def charger_coups_rapide(json_path: Path = MOVE_HISTORY_FILE, bin_path: Path = MOVE_HISTORY_BIN):
+    """Liste des coups UCI depuis le binaire s'il a été encodé depuis ce JSON exact, sinon None."""
+    try:
+        empreinte = empreinte_json(json_path.read_bytes())
+        with JournalBinaire(bin_path) as j:
+            if j.empreinte != empreinte:
+                return None
+            return j.coups()
+    except (OSError, ValueError):
+        return None
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args[:1] == ["encoder"]:
+        src = Path(args[1]) if len(args) > 1 else MOVE_HISTORY_FILE
+        dst = Path(args[2]) if len(args) > 2 else MOVE_HISTORY_BIN
+        n = depuis_json(src, dst)
+        print(f"💾 {n} demi-coups : {src} ({src.stat().st_size} o) → {dst} ({dst.stat().st_size} o)")
+    elif args[:1] == ["decoder"]:
+        src = Path(args[1]) if len(args) > 1 else MOVE_HISTORY_BIN
+        dst = Path(args[2]) if len(args) > 2 else MOVE_HISTORY_FILE
+        n = vers_json(src, dst)
+        print(f"💾 {n} demi-coups : {src} → {dst}")
+    else:
+        raise SystemExit("Usage : python journal_binaire.py encoder|decoder [source] [destination]")
@@ -0,0 +1,110 @@
+# legalite_batch.py — résolution en lot de (position, token) → coup légal
+#
+# Pour les configurations spéculatives / multi-parties : au lieu de reparser chaque
+# commentaire contre un chess.Board (et de régénérer legal_moves à chaque fois),
+#   1. l'ensemble des coups légaux de chaque position est construit UNE fois :
+#      tableau numpy de codes 16 bits (from | to << 6 | promotion…, cf. journal_binaire)
+#      + table SAN → code et suffixe SAN → codes ;
+#   2. les paires (position, token) sont dédoublonnées (les votes se répètent beaucoup) ;
+#   3. chaque token unique est traduit en code candidat dans l'ordre de try_parse
+#      (03_process_comments.py) : SAN, puis UCI, puis suffixe SAN unique — mais par
+#      lookup dans les tables au lieu de regénérer le SAN de tous les coups ;
+#   4. la légalité de tous les candidats est vérifiée d'un coup par np.isin sur des
+#      clés position << 16 | code.
+
+import re
+from collections import Counter
+
+import chess
+import numpy as np
+
+from journal_binaire import decoder_coup, encoder_coup
+
+UCI_RE = re.compile(r"^[a-h][1-8][a-h][1-8][qrbn]?$")
+AUCUN = -1
+
+
+class TablePosition:
+    """Coups légaux d'une position, indexés pour la résolution de tokens."""
+
+    def __init__(self, fen: str):
+        self.board = chess.Board(fen)
+        coups = list(self.board.legal_moves)
+        self.codes = np.fromiter((encoder_coup(m) for m in coups), dtype=np.int64, count=len(coups))
+        self.par_san = {}
+        suffixes = {}
+        for mv, code in zip(coups, self.codes.tolist()):
+            san = self.board.san(mv)
+            self.par_san[san] = code
+            self.par_san.setdefault(san.rstrip("+#"), code)
+            for n in (1, 2, 3):
+                suffixes.setdefault(san[-n:], set()).add(code)
+        # Fallback de try_parse : suffixe token[-3:] correspondant à un seul coup légal
+        self.suffixe_unique = {s: next(iter(c)) for s, c in suffixes.items() if len(c) == 1}
+        self.suffixe_ambigu = {s for s, c in suffixes.items() if len(c) > 1}
+
+
+def _code_candidat(table: TablePosition, token: str):
+    """Code du coup désigné par le token (légalité vérifiée ensuite en lot), ou AUCUN."""
+    if token in table.par_san:
+        return table.par_san[token]
+    # SAN non canonique (« Ng1f3 », capture sans x…) : même parseur que try_parse
+    try:
+        return encoder_coup(table.board.parse_san(token))
+    except ValueError:
+        pass
+    bas = token.lower()
+    if UCI_RE.match(bas):
+        try:
+            code = encoder_coup(chess.Move.from_uci(bas))
+        except ValueError:  # « e4e4 » : même case de départ et d'arrivée
+            code = AUCUN
+        if code in table.codes:  # UCI illégal → try_parse continue sur le fallback SAN
+            return code
+    suffixe = token[-3:]
+    if not suffixe:  # "".endswith → tous les coups : accepté seulement si coup unique
+        return int(table.codes[0]) if len(table.codes) == 1 else AUCUN
+    if suffixe in table.suffixe_ambigu:
+        return AUCUN
+    return table.suffixe_unique.get(suffixe, AUCUN)
+
+
+def resoudre_batch(fens, paires):
+    """
+    fens   : liste de FEN
+    paires : liste (indice de position, token normalisé par nettoyer_et_corriger_san)
+
+    Renvoie (acceptes, coups_uci, decomptes) :
+      acceptes    np.ndarray bool, une case par paire
+      coups_uci   liste UCI (None si rejeté)
+      decomptes   un Counter uci → nb de voix par position
+    """
+    tables = [TablePosition(fen) for fen in fens]
+
+    # Dédoublonnage des paires : chaque (position, token) n'est résolu qu'une fois
+    uniques = {}
+    inverse = np.empty(len(paires), dtype=np.int64)
+    for k, paire in enumerate(paires):
+        inverse[k] = uniques.setdefault(paire, len(uniques))
+    cles_uniques = list(uniques)
+
+    pos_u = np.fromiter((p for p, _ in cles_uniques), dtype=np.int64, count=len(cles_uniques))
+    code_u = np.fromiter(
+        (_code_candidat(tables[p], tok) for p, tok in cles_uniques),
+        dtype=np.int64, count=len(cles_uniques),
+    )
+
+    # Légalité vectorisée : clé = position << 16 | code
+    legales = np.concatenate([(i << 16) | t.codes for i, t in enumerate(tables)]) if tables else np.empty(0, np.int64)
+    ok_u = (code_u != AUCUN) & np.isin((pos_u << 16) | np.where(code_u == AUCUN, 0, code_u), legales)
+
+    acceptes = ok_u[inverse]
+    codes = code_u[inverse]
+    positions = pos_u[inverse]
+    coups_uci = [decoder_coup(int(c)).uci() if ok else None for c, ok in zip(codes.tolist(), acceptes.tolist())]
+
+    decomptes = [Counter() for _ in fens]
+    for p, uci in zip(positions.tolist(), coups_uci):
+        if uci:
+            decomptes[p][uci] += 1
+    return acceptes, coups_uci, decomptes
@@ -0,0 +1,63 @@
+# niveau_bot.py — émulation d'un bot faible par une seule recherche MultiPV + tirage
+#
+# Sous 1320 Elo (plancher de UCI_Elo), au lieu d'un coup uniformément aléatoire ou
+# d'une recherche tronquée en profondeur, on lance UNE recherche MultiPV peu profonde
+# puis on tire un coup parmi les candidats avec une probabilité
+#     p_i ∝ exp(-(meilleur_score - score_i) / T(elo))
+# Plus l'Elo est bas, plus la température T est haute : les erreurs restent
+# plausibles (coups « presque bons ») au lieu d'être absurdes.
+
+import math
+import random
+
+import chess
+import chess.engine
+
+ELO_MIN = 0
+ELO_MAX = 1320        # au-delà, on passe par UCI_LimitStrength / UCI_Elo
+MATE_SCORE = 10000
+
+
+def parametres_skill(elo: int):
+    """(profondeur, nb de candidats MultiPV, température en centipions) pour un Elo donné."""
+    elo = max(ELO_MIN, min(ELO_MAX, int(elo)))
+    ratio = 1 - elo / ELO_MAX                 # 1.0 à 0 Elo → 0.0 à 1320 Elo
+    profondeur = 4 + elo // 500               # 4 → 6
+    multipv = 6 + round(6 * ratio)            # 6 → 12 candidats
+    temperature = 40 + 360 * ratio            # 40 cp → 400 cp
+    return profondeur, multipv, temperature
+
+
+def tirer_candidat(candidats, temperature: float, rng=random):
+    """candidats : liste (coup, score_cp du point de vue du trait). Tirage softmax sur les écarts."""
+    meilleur = max(s for _, s in candidats)
+    poids = [math.exp(-(meilleur - s) / temperature) for _, s in candidats]
+    return rng.choices([m for m, _ in candidats], weights=poids, k=1)[0]
+
+
+def choisir_coup_skill(engine, board: chess.Board, elo: int, rng=random):
+    """Renvoie (coup, infos de la meilleure ligne) après une seule recherche MultiPV."""
+    profondeur, multipv, temperature = parametres_skill(elo)
+    infos = engine.analyse(board, chess.engine.Limit(depth=profondeur), multipv=multipv)
+    candidats = [
+        (info["pv"][0], info["score"].relative.score(mate_score=MATE_SCORE))
+        for info in infos
+        if info.get("pv") and info.get("score") is not None
+    ]
+    if not candidats:
+        return rng.choice(list(board.legal_moves)), {}
+    return tirer_candidat(candidats, temperature, rng), infos[0]
+
+
+def jouer_coup(engine, board: chess.Board, mode: str, valeur=None, temps_uci: float = 1.0, rng=random):
+    """Coup du bot pour un mode de run_bot.yml (random, depth, skill, uci)."""
+    if mode == "random":
+        return rng.choice(list(board.legal_moves))
+    if mode in ("skill", "depth"):
+        engine.configure({"UCI_LimitStrength": False})
+    if mode == "skill":
+        return choisir_coup_skill(engine, board, valeur, rng)[0]
+    if mode == "depth":
+        return engine.play(board, chess.engine.Limit(depth=int(valeur))).move
+    engine.configure({"UCI_LimitStrength": True, "UCI_Elo": int(valeur)})
+    return engine.play(board, chess.engine.Limit(time=temps_uci)).move
@@ -0,0 +1,196 @@
+# profilage.py — profilage optionnel des scripts du pipeline
+#
+# Activation : option `--profile` sur la ligne de commande ou PIPELINE_PROFILE=1.
+# À appeler tout en haut du script, avant les imports lourds :
+#
+#     import profilage
+#     profilage.activer("03_process_comments")
+#
+# Le script est alors relancé sous `python -X importtime` ; le processus enfant
+# tourne sous cProfile + tracemalloc. Chaque exécution écrit dans
+# data/profils/<horodatage µs>-<pid>-<script>/ :
+#   cprofile.pstats   dump pstats brut (snakeviz, pstats…)
+#   cprofile.txt      top des fonctions (temps cumulé)
+#   tracemalloc.txt   top des allocations + pic mémoire
+#   importtime.txt    sortie brute de -X importtime
+#   meta.json         script, durée, code retour, pic mémoire
+#
+# Comparaison de deux exécutions :
+#     python profilage.py comparer <dossier_A> <dossier_B>
+#     python profilage.py lister
+
+import atexit
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROFILS_DIR = Path("data/profils")
+PROFILE_ENV = "PIPELINE_PROFILE"
+_RUN_DIR_ENV = "_PIPELINE_PROFILE_RUN_DIR"
+TOP_N = 40
+
+
+def log(msg, type="info"):
+    icons = {"ok": "✅", "err": "❌", "warn": "⚠️", "info": "ℹ️", "save": "💾", "find": "🔎"}
+    print(f"{icons.get(type, '•')} {msg}")
+
+
+def demande() -> bool:
+    return "--profile" in sys.argv or os.getenv(PROFILE_ENV, "") not in ("", "0", "false")
+
+
+def activer(nom: str):
+    """Point d'entrée : ne fait rien si le profilage n'est pas demandé."""
+    voulu = demande()
+    if "--profile" in sys.argv:
+        sys.argv.remove("--profile")
+
+    run_dir = os.getenv(_RUN_DIR_ENV)
+    if run_dir:
+        _demarrer_enfant(Path(run_dir), nom)
+        return
+    if not voulu:
+        return
+
+    # µs + pid : deux exécutions simultanées du même script ne partagent jamais un dossier
+    run_dir = PROFILS_DIR / f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')}-{os.getpid()}-{nom}"
+    run_dir.mkdir(parents=True)
+    log(f"Profilage activé → {run_dir}", "find")
+    code = _relancer_sous_importtime(run_dir)
+    raise SystemExit(code)
+
+
+def _relancer_sous_importtime(run_dir: Path) -> int:
+    """Relance le script sous -X importtime ; sépare les lignes d'import du reste de stderr."""
+    # --profile a été retiré de argv : PROFILE_ENV le remplace pour que demande() reste
+    # vrai dans l'enfant (ex. 05 qui transmet profile=1 au workflow du bot)
+    env = {**os.environ, _RUN_DIR_ENV: str(run_dir), PROFILE_ENV: "1"}
+    cmd = [sys.executable, "-X", "importtime", sys.argv[0], *sys.argv[1:]]
+    with open(run_dir / "importtime.txt", "w", encoding="utf-8") as imports:
+        proc = subprocess.Popen(cmd, env=env, stderr=subprocess.PIPE, text=True, bufsize=1)
+        for ligne in proc.stderr:
+            if ligne.startswith("import time:"):
+                imports.write(ligne)
+            else:
+                sys.stderr.write(ligne)
+        return proc.wait()
+
+
+def _demarrer_enfant(run_dir: Path, nom: str):
+    import cProfile
+    import tracemalloc
+
+    tracemalloc.start(25)
+    profiler = cProfile.Profile()
+    debut = time.perf_counter()
+    profiler.enable()
+
+    def terminer():
+        profiler.disable()
+        duree = time.perf_counter() - debut
+        snapshot = tracemalloc.take_snapshot()
+        _, pic = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        _ecrire_resultats(run_dir, nom, profiler, snapshot, pic, duree)
+
+    atexit.register(terminer)
+
+
+def _ecrire_resultats(run_dir, nom, profiler, snapshot, pic, duree):
+    import io
+    import pstats
+    import tracemalloc
+
+    profiler.dump_stats(str(run_dir / "cprofile.pstats"))
+    buf = io.StringIO()
+    pstats.Stats(profiler, stream=buf).sort_stats("cumulative").print_stats(TOP_N)
+    (run_dir / "cprofile.txt").write_text(buf.getvalue(), encoding="utf-8")
+
+    filtres = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")]
+    lignes = [f"Pic mémoire tracé : {pic / 1024:.1f} KiB", ""]
+    for stat in snapshot.filter_traces(filtres).statistics("lineno")[:TOP_N]:
+        lignes.append(str(stat))
+    (run_dir / "tracemalloc.txt").write_text("\n".join(lignes) + "\n", encoding="utf-8")
+
+    meta = {
+        "script": nom,
+        "argv": sys.argv,
+        "duree_s": round(duree, 4),
+        "pic_memoire_octets": pic,
+        "horodatage": datetime.now(timezone.utc).isoformat(),
+    }
+    (run_dir / "meta.json").write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"💾 Profil écrit dans {run_dir}", file=sys.stderr)
+
+
+# -----------------------
+# Rapport de comparaison
+# -----------------------
+def charger_importtime(run_dir: Path) -> dict:
+    """Temps d'import cumulé (µs) par module de premier niveau."""
+    path = run_dir / "importtime.txt"
+    if not path.exists():
+        return {}
+    totaux = {}
+    for ligne in path.read_text(encoding="utf-8").splitlines():
+        # "import time:   self [us] |  cumulative | imported package"
+        parties = ligne[len("import time:"):].split("|")
+        if len(parties) != 3 or not parties[1].strip().isdigit():
+            continue
+        nom = parties[2].rstrip()
+        if nom.startswith("  "):  # import imbriqué → déjà compté dans le cumul du parent
+            continue
+        totaux[nom.strip()] = totaux.get(nom.strip(), 0) + int(parties[1])
+    return totaux
+
+
+def charger_fonctions(run_dir: Path) -> dict:
+    """(fichier:ligne(fonction)) → (nb appels, temps cumulé)."""
+    import pstats
+
+    path = run_dir / "cprofile.pstats"
+    if not path.exists():
+        return {}
+    stats = pstats.Stats(str(path)).stats
+    return {f"{Path(f).name}:{l}({fn})": (nc, ct) for (f, l, fn), (cc, nc, tt, ct, callers) in stats.items()}
+
+
+def comparer(dossier_a: Path, dossier_b: Path, top: int = 20):
+    meta_a = json.loads((dossier_a / "meta.json").read_text(encoding="utf-8"))
+    meta_b = json.loads((dossier_b / "meta.json").read_text(encoding="utf-8"))
+
+    print(f"=== {dossier_a.name}  →  {dossier_b.name} ===")
+    print(f"Durée         : {meta_a['duree_s']:.3f}s → {meta_b['duree_s']:.3f}s ({meta_b['duree_s'] - meta_a['duree_s']:+.3f}s)")
+    print(f"Pic mémoire   : {meta_a['pic_memoire_octets'] / 1024:.0f} KiB → {meta_b['pic_memoire_octets'] / 1024:.0f} KiB")
+
+    imp_a, imp_b = charger_importtime(dossier_a), charger_importtime(dossier_b)
+    print(f"Imports total : {sum(imp_a.values()) / 1000:.1f}ms → {sum(imp_b.values()) / 1000:.1f}ms")
+    print("\n--- Imports (écart cumulé, ms) ---")
+    ecarts = sorted(set(imp_a) | set(imp_b), key=lambda m: -abs(imp_b.get(m, 0) - imp_a.get(m, 0)))
+    for m in ecarts[:top]:
+        a, b = imp_a.get(m, 0) / 1000, imp_b.get(m, 0) / 1000
+        print(f"{b - a:+9.1f}  {a:8.1f} → {b:8.1f}  {m}")
+
+    fn_a, fn_b = charger_fonctions(dossier_a), charger_fonctions(dossier_b)
+    print("\n--- Fonctions (écart de temps cumulé, s) ---")
+    ecarts = sorted(set(fn_a) | set(fn_b), key=lambda f: -abs(fn_b.get(f, (0, 0))[1] - fn_a.get(f, (0, 0))[1]))
+    for f in ecarts[:top]:
+        (na, ca), (nb, cb) = fn_a.get(f, (0, 0)), fn_b.get(f, (0, 0))
+        print(f"{cb - ca:+9.3f}  {ca:8.3f} → {cb:8.3f}  appels {na} → {nb}  {f}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args[:1] == ["lister"]:
+        for d in sorted(PROFILS_DIR.glob("*")):
+            if (d / "meta.json").exists():
+                meta = json.loads((d / "meta.json").read_text(encoding="utf-8"))
+                print(f"{d.name:50s} {meta['duree_s']:8.3f}s  {meta['pic_memoire_octets'] / 1024:8.0f} KiB")
+    elif args[:1] == ["comparer"] and len(args) == 3:
+        comparer(Path(args[1]), Path(args[2]))
+    else:
+        raise SystemExit("Usage : python profilage.py lister | comparer <dossier_A> <dossier_B>")
@@ -0,0 +1,178 @@
+# reconciliation.py — recale move_history.json sur la liste de coups officielle de Lichess
+#
+# Compare le journal local avec `state.moves` (UCI) de la partie Lichess, trouve le
+# premier demi-coup divergent et ne réécrit que le suffixe à partir de là.
+# Un repère (data/reconciliation.json) mémorise jusqu'où le journal a déjà été
+# vérifié (coups ET fen_apres) : une exécution ne rejoue que les nouveaux demi-coups.
+# Chaque exécution écrit un rapport d'audit dans data/reconciliation_rapport.json.
+#
+# Usage : python reconciliation.py [--complet]   (--complet ignore le repère)
+
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import chess
+import requests
+
+import ecriture_atomique
+import journal_binaire
+
+LICHESS_BOT_TOKEN = os.getenv("LICHESS_BOT_TOKEN")
+GAME_ID_FILE = Path("data/game_id.txt")
+MOVE_HISTORY_FILE = Path("data/move_history.json")
+WATERMARK_FILE = Path("data/reconciliation.json")
+REPORT_FILE = Path("data/reconciliation_rapport.json")
+
+
+def log(msg, type="info"):
+    icons = {"ok": "✅", "err": "❌", "warn": "⚠️", "info": "ℹ️", "find": "🔎", "save": "💾", "recv": "📥"}
+    print(f"{icons.get(type, '•')} {msg}")
+
+
+def couleur_du_ply(ply: int) -> str:
+    return "blanc" if ply % 2 == 0 else "noir"
+
+
+def fetch_moves_lichess(game_id: str):
+    """Liste UCI officielle via la première ligne (gameFull) du flux de partie du bot."""
+    url = f"https://lichess.org/api/bot/game/stream/{game_id}"
+    headers = {"Authorization": f"Bearer {LICHESS_BOT_TOKEN}"}
+    try:
+        with requests.get(url, headers=headers, stream=True, timeout=15) as r:
+            if r.status_code != 200:
+                log(f"Erreur API game/stream : {r.status_code} {r.text[:200]}", "err")
+                return None
+            for ligne in r.iter_lines():
+                if not ligne:
+                    continue  # keep-alive
+                data = json.loads(ligne)
+                if data.get("type") == "gameFull":
+                    return data.get("state", {}).get("moves", "").split()
+                break
+    except Exception as e:
+        log(f"Erreur lecture flux Lichess : {e}", "err")
+        return None
+    log("Réponse gameFull introuvable", "err")
+    return None
+
+
+def charger_history():
+    if not MOVE_HISTORY_FILE.exists():
+        return []
+    try:
+        history = json.loads(MOVE_HISTORY_FILE.read_text(encoding="utf-8"))
+        return history if isinstance(history, list) else []
+    except Exception as e:
+        log(f"move_history.json illisible ({e}) → reconstruit depuis Lichess", "warn")
+        return []
+
+
+def charger_repere(game_id: str, history: list):
+    """Renvoie (ply, fen) du dernier point vérifié, ou (0, FEN initiale) si invalide."""
+    if WATERMARK_FILE.exists():
+        try:
+            rep = json.loads(WATERMARK_FILE.read_text(encoding="utf-8"))
+            n, fen = int(rep["plies_verifies"]), rep["fen"]
+            if rep.get("game_id") == game_id and 0 < n <= len(history) and history[n - 1].get("fen_apres") == fen:
+                return n, fen
+        except Exception:
+            pass
+    return 0, chess.STARTING_FEN
+
+
+def reconcilier(history: list, remote: list, depart: int, fen_depart: str):
+    """
+    Vérifie history[depart:] contre remote[depart:] et renvoie (nouvel_historique, diffs, fen_finale).
+    Seul le suffixe après le premier demi-coup divergent est réécrit.
+    """
+    board = chess.Board(fen_depart)
+    diffs = []
+    history = list(history)
+    k = depart
+
+    # 1) Préfixe commun : mêmes coups → on corrige juste les fen_apres fausses
+    while k < len(history) and k < len(remote) and history[k].get("coup") == remote[k]:
+        board.push_uci(remote[k])
+        fen = board.fen()
+        if history[k].get("fen_apres") != fen:
+            diffs.append({"ply": k + 1, "type": "fen_corrigee", "local": history[k].get("fen_apres"), "lichess": fen})
+            history[k] = {**history[k], "fen_apres": fen}
+        k += 1
+
+    # 2) Premier demi-coup divergent → remplacement du suffixe
+    if k < len(history) or k < len(remote):
+        maintenant = datetime.now(timezone.utc).isoformat()
+        for i in range(k, max(len(history), len(remote))):
+            local = history[i].get("coup") if i < len(history) else None
+            officiel = remote[i] if i < len(remote) else None
+            type_diff = "ajoute" if local is None else ("supprime" if officiel is None else "remplace")
+            diffs.append({"ply": i + 1, "type": type_diff, "local": local, "lichess": officiel})
+        suffixe = []
+        for i in range(k, len(remote)):
+            board.push_uci(remote[i])
+            suffixe.append({
+                "couleur": couleur_du_ply(i),
+                "coup": remote[i],
+                "fen_apres": board.fen(),
+                "horodatage": maintenant,
+                "source": "lichess",
+            })
+        history = history[:k] + suffixe
+
+    return history, diffs, board.fen()
+
+
+if __name__ == "__main__":
+    if not LICHESS_BOT_TOKEN:
+        raise SystemExit("❌ LICHESS_BOT_TOKEN manquant.")
+    if not GAME_ID_FILE.exists():
+        raise SystemExit("❌ game_id.txt introuvable.")
+    game_id = GAME_ID_FILE.read_text(encoding="utf-8").strip()
+
+    remote = fetch_moves_lichess(game_id)
+    if remote is None:
+        raise SystemExit(1)
+
+    # Lichess est interrogé hors verrou ; lecture → correction → écriture sous verrou
+    with ecriture_atomique.verrou():
+        history = charger_history()
+        if "--complet" in sys.argv:
+            depart, fen_depart = 0, chess.STARTING_FEN
+        else:
+            depart, fen_depart = charger_repere(game_id, history)
+        if depart > len(remote) or remote[:depart] != [e.get("coup") for e in history[:depart]]:
+            log("Repère incohérent avec Lichess → vérification complète", "warn")
+            depart, fen_depart = 0, chess.STARTING_FEN
+        log(f"Partie {game_id} : {len(history)} demi-coup(s) local, {len(remote)} sur Lichess, vérification depuis le ply {depart + 1}", "find")
+
+        nouvel_historique, diffs, fen_finale = reconcilier(history, remote, depart, fen_depart)
+
+        if diffs:
+            ecriture_atomique.ecrire_json(MOVE_HISTORY_FILE, nouvel_historique)
+            for d in diffs:
+                log(f"ply {d['ply']:>3} {d['type']:<13} local={d['local']} lichess={d['lichess']}", "warn")
+            log(f"{len(diffs)} écart(s) corrigé(s) dans {MOVE_HISTORY_FILE}", "save")
+        else:
+            log("Historique local conforme à Lichess", "ok")
+
+        # Journal binaire à accès direct, régénéré sur l'historique recalé
+        try:
+            journal_binaire.depuis_json(MOVE_HISTORY_FILE, journal_binaire.MOVE_HISTORY_BIN)
+        except Exception as e:
+            log(f"Journal binaire non régénéré : {e}", "warn")
+
+        ecriture_atomique.ecrire_json(WATERMARK_FILE, {
+            "game_id": game_id,
+            "plies_verifies": len(nouvel_historique),
+            "fen": fen_finale,
+        })
+        ecriture_atomique.ecrire_json(REPORT_FILE, {
+            "game_id": game_id,
+            "horodatage": datetime.now(timezone.utc).isoformat(),
+            "verifie_depuis_ply": depart + 1,
+            "plies_lichess": len(remote),
+            "ecarts": diffs,
+        })
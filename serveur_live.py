@@ -0,0 +1,274 @@
+# serveur_live.py — serveur HTTP asyncio (stdlib) de l'état live pour les overlays de stream
+#
+# Garde en mémoire la position, le dernier coup, l'historique, les votes et la
+# dernière miniature PNG, et les sert avec ETag / 304. Un flux Server-Sent Events
+# (/evenements) pousse chaque changement de votes ou de coup.
+#
+# L'état est alimenté de deux façons :
+#   - surveillance des fichiers de data/ (exécution locale du pipeline) ;
+#   - POST /publier/<nom> depuis les scripts du pipeline (LIVE_SERVER_URL +
+#     LIVE_SERVER_TOKEN), sans passer par un push git.
+#
+# Usage : python serveur_live.py [port]
+
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import urllib.request
+from pathlib import Path
+
+DATA_DIR = Path("data")
+LIVE_SERVER_URL = os.getenv("LIVE_SERVER_URL")
+LIVE_SERVER_TOKEN = os.getenv("LIVE_SERVER_TOKEN")
+POLL_INTERVAL_S = 0.5
+# Plus gros contenu publiable : la miniature PNG (YouTube plafonne les miniatures à 2 Mo)
+TAILLE_MAX_CORPS = 2 * 1024 * 1024
+# Messages SSE en attente par client ; au-delà, le client trop lent est déconnecté
+SSE_FILE_MAX = 64
+
+# nom → (fichier source, content-type, type d'événement SSE)
+RESSOURCES = {
+    "position": (DATA_DIR / "position.fen", "text/plain; charset=utf-8", "coup"),
+    "dernier_coup": (DATA_DIR / "dernier_coup.json", "application/json", "coup"),
+    "historique": (DATA_DIR / "move_history.json", "application/json", "coup"),
+    "votes": (DATA_DIR / "votes.json", "application/json", "vote"),
+    "miniature": (DATA_DIR / "thumbnail_black.png", "image/png", "miniature"),
+}
+ROUTES = {
+    "/position": "position",
+    "/dernier_coup.json": "dernier_coup",
+    "/move_history.json": "historique",
+    "/votes.json": "votes",
+    "/thumbnail_black.png": "miniature",
+}
+
+STATUTS = {200: "OK", 204: "No Content", 304: "Not Modified", 401: "Unauthorized",
+           404: "Not Found", 405: "Method Not Allowed", 400: "Bad Request", 413: "Payload Too Large"}
+
+
+def log(msg, type="info"):
+    icons = {"ok": "✅", "err": "❌", "warn": "⚠️", "info": "ℹ️", "send": "📤", "recv": "📥"}
+    print(f"{icons.get(type, '•')} {msg}")
+
+
+# -----------------------
+# Publication depuis le pipeline
+# -----------------------
+def publier(nom: str, contenu: bytes):
+    """Pousse une ressource vers le serveur live si LIVE_SERVER_URL est défini (best effort)."""
+    if not LIVE_SERVER_URL or nom not in RESSOURCES:
+        return False
+    req = urllib.request.Request(
+        f"{LIVE_SERVER_URL.rstrip('/')}/publier/{nom}",
+        data=contenu,
+        method="POST",
+        headers={"Authorization": f"Bearer {LIVE_SERVER_TOKEN or ''}"},
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=3) as r:
+            return r.status == 204
+    except Exception as e:
+        log(f"Publication live '{nom}' impossible : {e}", "warn")
+        return False
+
+
+# -----------------------
+# État en mémoire
+# -----------------------
+class EtatLive:
+    def __init__(self):
+        self.contenus = {}   # nom → bytes
+        self.etags = {}      # nom → '"sha1"'
+        self.mtimes = {}     # nom → mtime_ns du fichier lu
+        self.abonnes = {}    # asyncio.Queue d'un client SSE → son writer
+
+    def mettre_a_jour(self, nom: str, contenu: bytes):
+        etag = '"' + hashlib.sha1(contenu).hexdigest() + '"'
+        if self.etags.get(nom) == etag:
+            return
+        self.contenus[nom] = contenu
+        self.etags[nom] = etag
+        evenement = RESSOURCES[nom][2]
+        donnees = {"ressource": nom, "etag": etag}
+        if nom in ("votes", "dernier_coup", "position"):
+            try:
+                donnees["valeur"] = json.loads(contenu) if nom != "position" else contenu.decode("utf-8").strip()
+            except Exception:
+                pass
+        message = f"event: {evenement}\ndata: {json.dumps(donnees, ensure_ascii=False)}\n\n".encode("utf-8")
+        for q, writer in list(self.abonnes.items()):
+            try:
+                q.put_nowait(message)
+            except asyncio.QueueFull:
+                log("Client SSE trop lent → déconnecté", "warn")
+                del self.abonnes[q]
+                writer.transport.abort()
+
+    def relire_fichiers(self):
+        for nom, (path, _, _) in RESSOURCES.items():
+            try:
+                mtime = path.stat().st_mtime_ns
+            except FileNotFoundError:
+                continue
+            if self.mtimes.get(nom) == mtime:
+                continue
+            self.mtimes[nom] = mtime
+            try:
+                self.mettre_a_jour(nom, path.read_bytes())
+            except OSError as e:
+                log(f"Lecture {path} impossible : {e}", "warn")
+
+
+async def surveiller(etat: EtatLive):
+    while True:
+        etat.relire_fichiers()
+        await asyncio.sleep(POLL_INTERVAL_S)
+
+
+# -----------------------
+# HTTP minimal
+# -----------------------
+async def lire_requete(reader):
+    """Ligne de requête + en-têtes ; le corps est lu par l'appelant, une fois la requête validée."""
+    ligne = await reader.readline()
+    if not ligne:
+        return None
+    try:
+        methode, cible, _ = ligne.decode("latin-1").split(" ", 2)
+    except ValueError:
+        return None
+    entetes = {}
+    while True:
+        l = await reader.readline()
+        if l in (b"\r\n", b"\n", b""):
+            break
+        k, _, v = l.decode("latin-1").partition(":")
+        entetes[k.strip().lower()] = v.strip()
+    return methode, cible.split("?", 1)[0], entetes
+
+
+def longueur_corps(entetes):
+    """Content-Length annoncé (0 si absent), ou None s'il est invalide."""
+    try:
+        n = int(entetes.get("content-length", "0"))
+    except ValueError:
+        return None
+    return n if n >= 0 else None
+
+
+def reponse(statut: int, corps: bytes = b"", entetes=None) -> bytes:
+    lignes = [f"HTTP/1.1 {statut} {STATUTS.get(statut, '')}"]
+    entetes = dict(entetes or {})
+    entetes.setdefault("Content-Length", str(len(corps)))
+    entetes.setdefault("Access-Control-Allow-Origin", "*")
+    lignes += [f"{k}: {v}" for k, v in entetes.items()]
+    return ("\r\n".join(lignes) + "\r\n\r\n").encode("latin-1") + corps
+
+
+async def servir_sse(etat: EtatLive, writer):
+    q = asyncio.Queue(maxsize=SSE_FILE_MAX)
+    etat.abonnes[q] = writer
+    writer.write(
+        b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+        b"Connection: keep-alive\r\nAccess-Control-Allow-Origin: *\r\n\r\n"
+    )
+    # État initial pour qu'un overlay qui (re)connecte soit à jour tout de suite
+    for nom in ("position", "dernier_coup", "votes"):
+        if nom in etat.etags:
+            writer.write(f"event: {RESSOURCES[nom][2]}\ndata: {json.dumps({'ressource': nom, 'etag': etat.etags[nom]})}\n\n".encode("utf-8"))
+    try:
+        while True:
+            try:
+                message = await asyncio.wait_for(q.get(), timeout=15)
+            except asyncio.TimeoutError:
+                message = b": ping\n\n"
+            writer.write(message)
+            await writer.drain()
+    finally:
+        etat.abonnes.pop(q, None)
+
+
+async def gerer_client(etat: EtatLive, reader, writer):
+    try:
+        while True:
+            req = await lire_requete(reader)
+            if req is None:
+                break
+            methode, chemin, entetes = req
+            longueur = longueur_corps(entetes)
+
+            if chemin.startswith("/publier/"):
+                # Authentification et taille vérifiées AVANT de lire le corps ; une requête
+                # refusée n'est pas lue, la connexion est donc fermée après la réponse.
+                nom = chemin[len("/publier/"):]
+                if methode != "POST":
+                    statut = 405
+                elif not LIVE_SERVER_TOKEN or entetes.get("authorization") != f"Bearer {LIVE_SERVER_TOKEN}":
+                    statut = 401
+                elif nom not in RESSOURCES:
+                    statut = 404
+                elif longueur is None:
+                    statut = 400
+                elif longueur > TAILLE_MAX_CORPS:
+                    statut = 413
+                else:
+                    statut = 204
+                if statut != 204:
+                    writer.write(reponse(statut, entetes={"Connection": "close"}))
+                    await writer.drain()
+                    break
+                etat.mettre_a_jour(nom, await reader.readexactly(longueur))
+                writer.write(reponse(204))
+                await writer.drain()
+                continue
+
+            if longueur != 0:  # aucun corps attendu hors /publier
+                writer.write(reponse(400, entetes={"Connection": "close"}))
+                await writer.drain()
+                break
+
+            if chemin == "/evenements" and methode == "GET":
+                await servir_sse(etat, writer)
+                break
+
+            if methode not in ("GET", "HEAD"):
+                writer.write(reponse(405))
+            elif chemin not in ROUTES or ROUTES[chemin] not in etat.contenus:
+                writer.write(reponse(404))
+            else:
+                nom = ROUTES[chemin]
+                etag = etat.etags[nom]
+                communs = {"ETag": etag, "Cache-Control": "no-cache"}
+                if entetes.get("if-none-match") == etag:
+                    writer.write(reponse(304, entetes={**communs, "Content-Length": "0"}))
+                else:
+                    contenu = etat.contenus[nom]
+                    communs["Content-Type"] = RESSOURCES[nom][1]
+                    communs["Content-Length"] = str(len(contenu))
+                    writer.write(reponse(200, b"" if methode == "HEAD" else contenu, communs))
+            await writer.drain()
+            if entetes.get("connection", "").lower() == "close":
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def main(port: int):
+    etat = EtatLive()
+    etat.relire_fichiers()
+    serveur = await asyncio.start_server(lambda r, w: gerer_client(etat, r, w), "0.0.0.0", port)
+    log(f"Serveur live sur http://0.0.0.0:{port} (SSE : /evenements)", "ok")
+    async with serveur:
+        await asyncio.gather(serveur.serve_forever(), surveiller(etat))
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else int(os.getenv("LIVE_SERVER_PORT", "8765"))
+    try:
+        asyncio.run(main(port))
+    except KeyboardInterrupt:
+        log("Arrêt du serveur live", "info")
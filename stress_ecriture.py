@@ -0,0 +1,108 @@
+# stress_ecriture.py — écrivains/lecteurs concurrents sur ecriture_atomique
+#
+# Usage : python stress_ecriture.py [nb_ecrivains] [ajouts_par_ecrivain]
+# Dans un dossier temporaire, N processus écrivent en parallèle :
+#   - une « transaction » position.fen + dernier_coup.json (les deux doivent concorder) ;
+#   - un ajout à move_history.json (lecture-modification-écriture).
+# Des lecteurs vérifient en continu que chaque fichier se parse toujours et que
+# l'instantané pris sous verrou partagé est cohérent. À la fin, aucun ajout ne
+# doit manquer (longueur = N × ajouts). Affiche le temps d'attente du verrou.
+
+import json
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import ecriture_atomique
+
+ecriture_atomique.ATTENTE_SIGNALEE_S = float("inf")  # attentes longues attendues ici : résumé à la fin
+
+DATA_DIR = Path("data")
+FEN_FILE = DATA_DIR / "position.fen"
+LAST_MOVE_FILE = DATA_DIR / "dernier_coup.json"
+MOVE_HISTORY_FILE = DATA_DIR / "move_history.json"
+
+
+def ecrivain(num: int, nb_ajouts: int, sortie):
+    for k in range(nb_ajouts):
+        marque = f"{num}-{k}"
+        with ecriture_atomique.verrou():
+            ecriture_atomique.ecrire_texte(FEN_FILE, marque)
+            ecriture_atomique.ecrire_json(LAST_MOVE_FILE, {"dernier_coup": marque, "fen": marque})
+
+        with ecriture_atomique.verrou():
+            history = json.loads(MOVE_HISTORY_FILE.read_text(encoding="utf-8"))
+            history.append({"couleur": "noir", "coup": marque})
+            ecriture_atomique.ecrire_json(MOVE_HISTORY_FILE, history)
+    sortie.put(dict(ecriture_atomique.STATS))
+
+
+def lecteur(arret, sortie):
+    lectures = illisibles = incoherents = 0
+    while not arret.is_set():
+        # Sans verrou : chaque fichier doit rester entier (rename atomique)
+        try:
+            json.loads(MOVE_HISTORY_FILE.read_text(encoding="utf-8"))
+            json.loads(LAST_MOVE_FILE.read_text(encoding="utf-8"))
+        except ValueError:
+            illisibles += 1
+        # Sous verrou partagé : les deux fichiers d'une transaction concordent
+        with ecriture_atomique.verrou(partage=True):
+            fen = FEN_FILE.read_text(encoding="utf-8")
+            dernier = json.loads(LAST_MOVE_FILE.read_text(encoding="utf-8"))
+        if dernier["fen"] != fen:
+            incoherents += 1
+        lectures += 1
+    sortie.put({"lectures": lectures, "illisibles": illisibles, "incoherents": incoherents})
+
+
+if __name__ == "__main__":
+    nb_ecrivains = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    nb_ajouts = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # data/.lock et data/* relatifs au dossier temporaire
+        DATA_DIR.mkdir()
+        ecriture_atomique.ecrire_texte(FEN_FILE, "init")
+        ecriture_atomique.ecrire_json(LAST_MOVE_FILE, {"dernier_coup": None, "fen": "init"})
+        ecriture_atomique.ecrire_json(MOVE_HISTORY_FILE, [])
+
+        ctx = mp.get_context("fork")
+        sortie_e, sortie_l, arret = ctx.Queue(), ctx.Queue(), ctx.Event()
+        lecteurs = [ctx.Process(target=lecteur, args=(arret, sortie_l)) for _ in range(4)]
+        ecrivains = [ctx.Process(target=ecrivain, args=(i, nb_ajouts, sortie_e)) for i in range(nb_ecrivains)]
+
+        debut = time.perf_counter()
+        for p in lecteurs + ecrivains:
+            p.start()
+        stats = [sortie_e.get() for _ in ecrivains]
+        for p in ecrivains:
+            p.join()
+        duree = time.perf_counter() - debut
+        arret.set()
+        lus = [sortie_l.get() for _ in lecteurs]
+        for p in lecteurs:
+            p.join()
+
+        history = json.loads(MOVE_HISTORY_FILE.read_text(encoding="utf-8"))
+        attendu = nb_ecrivains * nb_ajouts
+        restes = [f.name for f in DATA_DIR.iterdir() if f.name.endswith(".tmp")]
+        os.chdir("/")
+
+    acquisitions = sum(s["acquisitions"] for s in stats)
+    attente = sum(s["attente_totale_s"] for s in stats)
+    print(f"{nb_ecrivains} écrivains × {nb_ajouts} ajouts en {duree:.2f}s")
+    print(f"move_history.json : {len(history)}/{attendu} entrées")
+    print(f"lectures : {sum(l['lectures'] for l in lus)}, illisibles : {sum(l['illisibles'] for l in lus)}, "
+          f"instantanés incohérents : {sum(l['incoherents'] for l in lus)}")
+    print(f"verrou : {acquisitions} acquisitions, attente moyenne {attente / acquisitions * 1000:.1f} ms, "
+          f"max {max(s['attente_max_s'] for s in stats) * 1000:.1f} ms")
+    print(f"fichiers temporaires restants : {len(restes)}")
+
+    assert len(history) == attendu, "ajouts perdus"
+    assert len({e["coup"] for e in history}) == attendu, "ajouts dupliqués"
+    assert not any(l["illisibles"] or l["incoherents"] for l in lus), "lecture incohérente"
+    assert not restes, "fichiers temporaires orphelins"
@@ -0,0 +1,109 @@
+# stub_youtube.py — bouchon local de l'endpoint OAuth + thumbnails.set (upload resumable)
+#
+# Usage : python stub_youtube.py [port] [--coupure]
+#   --coupure : le premier envoi de données ne reçoit que la moitié des octets puis
+#               répond 503, pour exercer la reprise de upload_miniature.py.
+#
+#   YOUTUBE_UPLOAD_BASE=http://localhost:8900 OAUTH_TOKEN_URI=http://localhost:8900/token \
+#   YOUTUBE_VIDEO_ID=test YOUTUBE_CLIENT_ID=x YOUTUBE_CLIENT_SECRET=x YOUTUBE_REFRESH_TOKEN=x \
+#   python 07_upload_thumbnail.py
+#
+# GET /derniere renvoie l'empreinte et la taille du dernier upload complet.
+
+import hashlib
+import json
+import sys
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+JETON = "stub-access-token"
+COUPURE = "--coupure" in sys.argv
+SESSIONS = {}   # id → {"video_id", "taille", "recu": bytearray, "coupee": bool}
+DERNIER = {}
+
+
+class Handler(BaseHTTPRequestHandler):
+    def _repondre(self, statut, corps=None, entetes=None):
+        data = json.dumps(corps).encode("utf-8") if corps is not None else b""
+        self.send_response(statut)
+        for k, v in (entetes or {}).items():
+            self.send_header(k, v)
+        if data:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _corps(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+
+    def do_GET(self):
+        if self.path == "/derniere":
+            return self._repondre(200, DERNIER)
+        self._repondre(404)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        self._corps()
+        if url.path == "/token":
+            return self._repondre(200, {"access_token": JETON, "expires_in": 3600, "token_type": "Bearer"})
+        if url.path == "/upload/youtube/v3/thumbnails/set":
+            if self.headers.get("Authorization") != f"Bearer {JETON}":
+                return self._repondre(401, {"error": "invalid_token"})
+            qs = parse_qs(url.query)
+            if qs.get("uploadType") != ["resumable"]:
+                return self._repondre(400, {"error": "uploadType=resumable attendu"})
+            sid = uuid.uuid4().hex
+            SESSIONS[sid] = {
+                "video_id": qs.get("videoId", [""])[0],
+                "taille": int(self.headers.get("X-Upload-Content-Length", 0)),
+                "recu": bytearray(),
+                "coupee": False,
+            }
+            hote = self.headers.get("Host", f"localhost:{self.server.server_address[1]}")
+            return self._repondre(200, entetes={"Location": f"http://{hote}/upload/session/{sid}"})
+        self._repondre(404)
+
+    def do_PUT(self):
+        url = urlparse(self.path)
+        sid = url.path.rsplit("/", 1)[-1]
+        session = SESSIONS.get(sid)
+        if not url.path.startswith("/upload/session/") or session is None:
+            return self._repondre(404)
+        data = self._corps()
+        plage = self.headers.get("Content-Range", "")
+        recu = session["recu"]
+
+        if plage.startswith("bytes */"):
+            if len(recu) >= session["taille"]:
+                return self._repondre(200, self._terminer(session))
+            entetes = {"Range": f"bytes=0-{len(recu) - 1}"} if recu else {}
+            return self._repondre(308, entetes=entetes)
+
+        debut = int(plage.split(" ")[1].split("-")[0])
+        if debut != len(recu):
+            return self._repondre(400, {"error": f"reprise attendue à {len(recu)}, reçu {debut}"})
+        if COUPURE and not session["coupee"]:
+            session["coupee"] = True
+            recu += data[: len(data) // 2]
+            return self._repondre(503, {"error": "coupure simulée"})
+        recu += data
+        if len(recu) >= session["taille"]:
+            return self._repondre(200, self._terminer(session))
+        self._repondre(308, entetes={"Range": f"bytes=0-{len(recu) - 1}"})
+
+    def _terminer(self, session):
+        DERNIER.update({
+            "video_id": session["video_id"],
+            "taille": len(session["recu"]),
+            "sha256": hashlib.sha256(session["recu"]).hexdigest(),
+        })
+        return {"kind": "youtube#thumbnailSetResponse", "items": [{"default": {"url": "stub"}}]}
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    port = int(args[0]) if args else 8900
+    print(f"✅ Bouchon YouTube sur http://localhost:{port}{' (coupure simulée)' if COUPURE else ''}")
+    ThreadingHTTPServer(("0.0.0.0", port), Handler).serve_forever()
@@ -0,0 +1,242 @@
+# tournoi_calibrage.py — tournoi hors ligne entre les modes du bot pour recalibrer les seuils Elo
+#
+# Joue des parties entre chaque paire de configurations (random, depth N, skill E,
+# uci E) sur un pool de processus, chacun avec ses propres instances Stockfish.
+# Chaque résultat est ajouté immédiatement à data/calibration/resultats.jsonl :
+# relancer la commande reprend là où le tournoi s'était arrêté.
+#
+# Les Elo sont estimés par un modèle de Bradley-Terry (algorithme MM), calé sur
+# les valeurs nominales des configurations `uci` (UCI_Elo). La table produite
+# (data/calibration_elo.json) est lue par 05_play_black.py.
+#
+# Les configurations `uci` jouent par défaut à 1 s par coup, comme run_bot.yml :
+# l'échelle n'est valable que dans les conditions où elle est utilisée. Le temps
+# effectivement joué est enregistré avec chaque partie et dans la table.
+#
+# Usage :
+#   python tournoi_calibrage.py jouer [parties_par_paire] [processus] [temps_uci_s]
+#   python tournoi_calibrage.py estimer
+
+import json
+import math
+import os
+import random
+import shutil
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from itertools import combinations
+from pathlib import Path
+
+import chess
+import chess.engine
+
+import niveau_bot
+
+DATA_DIR = Path("data")
+RESULTATS_FILE = DATA_DIR / "calibration" / "resultats.jsonl"
+CALIBRATION_FILE = DATA_DIR / "calibration_elo.json"
+
+CONFIGS = [
+    "random",
+    "depth:1", "depth:2", "depth:3",
+    "skill:300", "skill:600", "skill:800", "skill:1000", "skill:1100", "skill:1250",
+    "uci:1320", "uci:1500", "uci:1800",
+]
+PLIES_OUVERTURE = 4     # demi-coups aléatoires (même ouverture pour les deux couleurs)
+PLIES_MAX = 200         # au-delà : nulle par arbitrage
+ITERATIONS_MM = 500
+TEMPS_UCI_PRODUCTION = 1.0  # Limit(time=1.0) de run_bot.yml
+
+_moteurs = None
+
+
+def log(msg, type="info"):
+    icons = {"ok": "✅", "err": "❌", "warn": "⚠️", "info": "ℹ️", "save": "💾", "find": "🔎"}
+    print(f"{icons.get(type, '•')} {msg}", flush=True)
+
+
+def parser_config(spec: str):
+    mode, _, valeur = spec.partition(":")
+    return mode, (int(valeur) if valeur else None)
+
+
+# -----------------------
+# Parties (processus du pool)
+# -----------------------
+def _init_worker():
+    """Deux moteurs par processus : un par camp, configurés indépendamment."""
+    global _moteurs
+    path = shutil.which("stockfish")
+    _moteurs = [chess.engine.SimpleEngine.popen_uci(path), chess.engine.SimpleEngine.popen_uci(path)]
+
+
+def jouer_partie(partie_id: str, blanc: str, noir: str, graine: int, temps_uci: float):
+    rng = random.Random(graine)
+    board = chess.Board()
+    ouverture = random.Random(graine // 2)  # même graine pour la revanche couleurs inversées
+    for _ in range(PLIES_OUVERTURE):
+        board.push(ouverture.choice(list(board.legal_moves)))
+
+    camps = {chess.WHITE: (parser_config(blanc), _moteurs[0]), chess.BLACK: (parser_config(noir), _moteurs[1])}
+    while not board.is_game_over(claim_draw=True) and board.ply() < PLIES_MAX:
+        (mode, valeur), engine = camps[board.turn]
+        board.push(niveau_bot.jouer_coup(engine, board, mode, valeur, temps_uci=temps_uci, rng=rng))
+
+    resultat = board.result(claim_draw=True)
+    if resultat == "*":
+        resultat = "1/2-1/2"
+    return {"id": partie_id, "blanc": blanc, "noir": noir, "resultat": resultat, "plies": board.ply(),
+            "temps_uci": temps_uci}
+
+
+def parties_a_jouer(parties_par_paire: int):
+    """(id, blanc, noir, graine) pour chaque paire, couleurs alternées."""
+    for a, b in combinations(CONFIGS, 2):
+        for k in range(parties_par_paire):
+            blanc, noir = (a, b) if k % 2 == 0 else (b, a)
+            graine = zlib.crc32(f"{a}|{b}|{k // 2}".encode()) * 2 + k % 2
+            yield f"{a}|{b}|{k}", blanc, noir, graine
+
+
+def charger_resultats():
+    if not RESULTATS_FILE.exists():
+        return []
+    resultats = []
+    for ligne in RESULTATS_FILE.read_text(encoding="utf-8").splitlines():
+        try:
+            resultats.append(json.loads(ligne))
+        except ValueError:
+            continue  # ligne tronquée par une interruption
+    return resultats
+
+
+def jouer_tournoi(parties_par_paire: int, processus: int, temps_uci: float):
+    if not shutil.which("stockfish"):
+        raise SystemExit("❌ Stockfish introuvable")
+    deja = {r["id"] for r in charger_resultats()}
+    a_jouer = [p for p in parties_a_jouer(parties_par_paire) if p[0] not in deja]
+    log(f"{len(deja)} partie(s) déjà jouée(s), {len(a_jouer)} à jouer sur {processus} processus", "find")
+    if not a_jouer:
+        return
+
+    RESULTATS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(RESULTATS_FILE, "a", encoding="utf-8") as f, \
+            ProcessPoolExecutor(max_workers=processus, initializer=_init_worker) as pool:
+        futures = [pool.submit(jouer_partie, pid, blanc, noir, graine, temps_uci) for pid, blanc, noir, graine in a_jouer]
+        for n, fut in enumerate(as_completed(futures), 1):
+            try:
+                r = fut.result()
+            except Exception as e:
+                log(f"Partie en échec : {e}", "warn")
+                continue
+            f.write(json.dumps(r) + "\n")
+            f.flush()
+            if n % 50 == 0 or n == len(futures):
+                log(f"{n}/{len(futures)} parties terminées", "info")
+
+
+# -----------------------
+# Estimation Elo (Bradley-Terry, MM)
+# -----------------------
+def estimer_elo(resultats):
+    """Elo estimé par configuration, calé sur la moyenne des configurations uci nominales."""
+    noms = sorted({r["blanc"] for r in resultats} | {r["noir"] for r in resultats})
+    points = {n: 0.0 for n in noms}
+    matchs = {}
+    for r in resultats:
+        a, b = r["blanc"], r["noir"]
+        score_blanc = {"1-0": 1.0, "0-1": 0.0}.get(r["resultat"], 0.5)
+        points[a] += score_blanc
+        points[b] += 1 - score_blanc
+        cle = tuple(sorted((a, b)))
+        matchs[cle] = matchs.get(cle, 0) + 1
+    # Une nulle virtuelle par paire rencontrée : évite les forces nulles/infinies
+    for a, b in matchs:
+        points[a] += 0.5
+        points[b] += 0.5
+        matchs[(a, b)] += 1
+
+    gamma = {n: 1.0 for n in noms}
+    for _ in range(ITERATIONS_MM):
+        denom = {n: 0.0 for n in noms}
+        for (a, b), n_ab in matchs.items():
+            d = n_ab / (gamma[a] + gamma[b])
+            denom[a] += d
+            denom[b] += d
+        nouveau = {i: points[i] / denom[i] if denom[i] else gamma[i] for i in noms}
+        moyenne_log = sum(math.log(g) for g in nouveau.values()) / len(nouveau)
+        gamma = {n: g / math.exp(moyenne_log) for n, g in nouveau.items()}
+
+    elo = {n: 400 * math.log10(g) for n, g in gamma.items()}
+    ancres = [(n, parser_config(n)[1]) for n in noms if parser_config(n)[0] == "uci"]
+    decalage = sum(v - elo[n] for n, v in ancres) / len(ancres) if ancres else 1500
+    return {n: round(e + decalage) for n, e in elo.items()}
+
+
+def construire_table(elo):
+    """Configurations triées par Elo estimé + alertes de non-monotonie par mode."""
+    table = sorted(
+        ({"config": c, "mode": parser_config(c)[0], "valeur": parser_config(c)[1], "elo_estime": e} for c, e in elo.items()),
+        key=lambda t: t["elo_estime"],
+    )
+    alertes = []
+    for mode in ("depth", "skill", "uci"):
+        serie = sorted((t for t in table if t["mode"] == mode), key=lambda t: t["valeur"])
+        for x, y in zip(serie, serie[1:]):
+            if y["elo_estime"] <= x["elo_estime"]:
+                alertes.append(f"{y['config']} ({y['elo_estime']}) n'est pas plus fort que {x['config']} ({x['elo_estime']})")
+    return table, alertes
+
+
+def estimer_et_ecrire():
+    resultats = charger_resultats()
+    if not resultats:
+        raise SystemExit(f"❌ Aucun résultat dans {RESULTATS_FILE}")
+    elo = estimer_elo(resultats)
+    table, alertes = construire_table(elo)
+    temps = sorted({r.get("temps_uci") for r in resultats}, key=lambda t: (t is None, t))
+    if len(temps) > 1:
+        alertes.append(f"parties jouées à des temps UCI différents : {temps}")
+    elif temps[0] != TEMPS_UCI_PRODUCTION:
+        alertes.append(f"temps UCI du tournoi ({temps[0]} s) ≠ production ({TEMPS_UCI_PRODUCTION} s)")
+    for t in table:
+        log(f"{t['config']:<12} {t['elo_estime']:>6}", "info")
+    for a in alertes:
+        log(a, "warn")
+    CALIBRATION_FILE.write_text(json.dumps({
+        "horodatage": datetime.now(timezone.utc).isoformat(),
+        "parties": len(resultats),
+        "temps_uci": temps[0] if len(temps) == 1 else temps,
+        "table": table,
+        "alertes": alertes,
+    }, ensure_ascii=False, indent=2), encoding="utf-8")
+    log(f"Table de calibration écrite dans {CALIBRATION_FILE}", "save")
+
+
+def config_pour_elo(elo_cible: int, path: Path = CALIBRATION_FILE):
+    """(mode, valeur) dont l'Elo estimé est le plus proche de la cible, ou None sans calibration."""
+    try:
+        table = json.loads(path.read_text(encoding="utf-8"))["table"]
+    except (OSError, ValueError, KeyError):
+        return None
+    if not table:
+        return None
+    meilleure = min(table, key=lambda t: abs(t["elo_estime"] - elo_cible))
+    return meilleure["mode"], meilleure["valeur"]
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args[:1] == ["jouer"]:
+        jouer_tournoi(
+            parties_par_paire=int(args[1]) if len(args) > 1 else 20,
+            processus=int(args[2]) if len(args) > 2 else (os.cpu_count() or 2),
+            temps_uci=float(args[3]) if len(args) > 3 else TEMPS_UCI_PRODUCTION,
+        )
+        estimer_et_ecrire()
+    elif args[:1] == ["estimer"]:
+        estimer_et_ecrire()
+    else:
+        raise SystemExit("Usage : python tournoi_calibrage.py jouer [parties_par_paire] [processus] [temps_uci_s] | estimer")
@@ -0,0 +1,200 @@
+# upload_miniature.py — envoi de la miniature sur YouTube (thumbnails.set), seulement si elle a changé
+#
+# - Les octets PNG arrivent directement du rendu (06) : pas de relecture disque.
+# - Pas d'envoi si le SHA-256 est identique au dernier envoi réussi (data/miniature_upload.json).
+# - Le jeton d'accès OAuth est mis en cache entre exécutions (OAUTH_CACHE_FILE) et
+#   n'est rafraîchi qu'à expiration. Ce cache ne sert qu'en local : sur GitHub Actions,
+#   chaque runner part d'un ~/.cache vide, donc le jeton est rafraîchi à chaque run
+#   (volontairement pas d'actions/cache : les caches sont lisibles depuis les PR).
+# - Upload « resumable » (uploadType=resumable) avec reprise et nouvelles tentatives.
+#
+# Les URL sont surchargeables (YOUTUBE_UPLOAD_BASE, OAUTH_TOKEN_URI) pour tester
+# contre un bouchon local : voir stub_youtube.py.
+
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import requests
+
+import ecriture_atomique
+
+YOUTUBE_VIDEO_ID = os.getenv("YOUTUBE_VIDEO_ID")
+YOUTUBE_CLIENT_ID = os.getenv("YOUTUBE_CLIENT_ID")
+YOUTUBE_CLIENT_SECRET = os.getenv("YOUTUBE_CLIENT_SECRET")
+YOUTUBE_REFRESH_TOKEN = os.getenv("YOUTUBE_REFRESH_TOKEN")
+
+YOUTUBE_UPLOAD_BASE = os.getenv("YOUTUBE_UPLOAD_BASE", "https://www.googleapis.com")
+OAUTH_TOKEN_URI = os.getenv("OAUTH_TOKEN_URI", "https://oauth2.googleapis.com/token")
+# Jamais dans data/ : le jeton ne doit pas être commité
+OAUTH_CACHE_FILE = Path(os.getenv("OAUTH_CACHE_FILE", Path.home() / ".cache" / "youtube-v6" / "oauth_token.json"))
+UPLOAD_STATE_FILE = Path("data/miniature_upload.json")
+
+MAX_TENTATIVES = 5
+MARGE_EXPIRATION_S = 60
+STATUTS_TRANSITOIRES = (500, 502, 503, 504)
+
+_session = requests.Session()
+
+
+def log(msg, type="info"):
+    icons = {"ok": "✅", "err": "❌", "warn": "⚠️", "info": "ℹ️", "send": "📤", "recv": "📥", "save": "💾"}
+    print(f"{icons.get(type, '•')} {msg}")
+
+
+class ErreurUpload(Exception):
+    pass
+
+
+# -----------------------
+# OAuth
+# -----------------------
+def _lire_cache_jeton():
+    try:
+        data = json.loads(OAUTH_CACHE_FILE.read_text(encoding="utf-8"))
+        if data.get("expires_at", 0) - MARGE_EXPIRATION_S > time.time():
+            return data["access_token"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
+
+
+def jeton_acces(forcer=False):
+    """Jeton d'accès depuis le cache, ou rafraîchi via le refresh token."""
+    if not forcer:
+        jeton = _lire_cache_jeton()
+        if jeton:
+            return jeton
+    if not (YOUTUBE_CLIENT_ID and YOUTUBE_CLIENT_SECRET and YOUTUBE_REFRESH_TOKEN):
+        raise ErreurUpload("Identifiants OAuth YouTube manquants")
+    try:
+        r = _session.post(OAUTH_TOKEN_URI, data={
+            "client_id": YOUTUBE_CLIENT_ID,
+            "client_secret": YOUTUBE_CLIENT_SECRET,
+            "refresh_token": YOUTUBE_REFRESH_TOKEN,
+            "grant_type": "refresh_token",
+        }, timeout=20)
+    except requests.RequestException as e:
+        raise ErreurUpload(f"Rafraîchissement OAuth impossible : {e}") from e
+    if r.status_code != 200:
+        raise ErreurUpload(f"Rafraîchissement OAuth KO : {r.status_code} {r.text[:200]}")
+    data = r.json()
+    OAUTH_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    OAUTH_CACHE_FILE.write_text(json.dumps({
+        "access_token": data["access_token"],
+        "expires_at": time.time() + int(data.get("expires_in", 3600)),
+    }), encoding="utf-8")
+    os.chmod(OAUTH_CACHE_FILE, 0o600)
+    return data["access_token"]
+
+
+# -----------------------
+# Upload resumable
+# -----------------------
+def _ouvrir_session(video_id, taille, jeton):
+    url = f"{YOUTUBE_UPLOAD_BASE}/upload/youtube/v3/thumbnails/set"
+    try:
+        r = _session.post(url, params={"videoId": video_id, "uploadType": "resumable"}, headers={
+            "Authorization": f"Bearer {jeton}",
+            "X-Upload-Content-Type": "image/png",
+            "X-Upload-Content-Length": str(taille),
+            "Content-Length": "0",
+        }, timeout=20)
+    except requests.RequestException as e:
+        raise ErreurUpload(f"Ouverture session resumable impossible : {e}") from e
+    if r.status_code == 401:
+        return None
+    if r.status_code != 200 or "Location" not in r.headers:
+        raise ErreurUpload(f"Ouverture session resumable KO : {r.status_code} {r.text[:200]}")
+    return r.headers["Location"]
+
+
+def _octets_recus(session_url, taille, jeton):
+    """Interroge la session : nombre d'octets déjà reçus (ou None si l'upload est terminé)."""
+    r = _session.put(session_url, headers={
+        "Authorization": f"Bearer {jeton}",
+        "Content-Range": f"bytes */{taille}",
+        "Content-Length": "0",
+    }, timeout=20)
+    if r.status_code in (200, 201):
+        return None
+    if r.status_code == 308:
+        plage = r.headers.get("Range")  # "bytes=0-1234"
+        return int(plage.split("-")[1]) + 1 if plage else 0
+    if r.status_code in STATUTS_TRANSITOIRES:  # réessayé par televerser, comme un 5xx du PUT
+        raise requests.HTTPError(f"Statut session resumable {r.status_code}", response=r)
+    raise ErreurUpload(f"Statut session resumable KO : {r.status_code} {r.text[:200]}")
+
+
+def televerser(png_bytes: bytes, video_id: str = None):
+    """Envoie la miniature ; reprend l'upload en cas de coupure ou d'erreur 5xx."""
+    video_id = video_id or YOUTUBE_VIDEO_ID
+    if not video_id:
+        raise ErreurUpload("YOUTUBE_VIDEO_ID manquant")
+    taille = len(png_bytes)
+
+    jeton = jeton_acces()
+    session_url = _ouvrir_session(video_id, taille, jeton)
+    if session_url is None:  # jeton en cache révoqué
+        jeton = jeton_acces(forcer=True)
+        session_url = _ouvrir_session(video_id, taille, jeton)
+        if session_url is None:
+            raise ErreurUpload("OAuth refusé (401) même après rafraîchissement")
+
+    debut = 0
+    for tentative in range(1, MAX_TENTATIVES + 1):
+        try:
+            if tentative > 1:
+                recus = _octets_recus(session_url, taille, jeton)
+                if recus is None:
+                    return {}
+                debut = recus
+            r = _session.put(session_url, data=png_bytes[debut:], headers={
+                "Authorization": f"Bearer {jeton}",
+                "Content-Type": "image/png",
+                "Content-Range": f"bytes {debut}-{taille - 1}/{taille}",
+            }, timeout=60)
+            if r.status_code in (200, 201):
+                return r.json() if r.content else {}
+            if r.status_code != 308 and r.status_code not in STATUTS_TRANSITOIRES:
+                raise ErreurUpload(f"Upload KO : {r.status_code} {r.text[:200]}")
+            log(f"Upload interrompu ({r.status_code}), tentative {tentative}/{MAX_TENTATIVES}", "warn")
+        except requests.RequestException as e:  # coupure, timeout de lecture, 5xx de la sonde…
+            log(f"Requête en échec ({e}), tentative {tentative}/{MAX_TENTATIVES}", "warn")
+
+        if tentative < MAX_TENTATIVES:
+            time.sleep(min(2 ** (tentative - 1), 16))
+    raise ErreurUpload(f"Upload abandonné après {MAX_TENTATIVES} tentatives")
+
+
+# -----------------------
+# Détection de changement
+# -----------------------
+def _dernier_envoi():
+    try:
+        return json.loads(UPLOAD_STATE_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def televerser_si_change(png_bytes: bytes, video_id: str = None):
+    """Envoie la miniature sauf si identique au dernier envoi réussi. Renvoie True si envoyée."""
+    video_id = video_id or YOUTUBE_VIDEO_ID
+    empreinte = hashlib.sha256(png_bytes).hexdigest()
+    precedent = _dernier_envoi()
+    if precedent.get("sha256") == empreinte and precedent.get("video_id") == video_id:
+        log("Miniature inchangée depuis le dernier envoi → upload ignoré", "info")
+        return False
+
+    log(f"Envoi de la miniature ({len(png_bytes)} octets) pour {video_id}", "send")
+    reponse = televerser(png_bytes, video_id)
+    ecriture_atomique.ecrire_json(UPLOAD_STATE_FILE, {
+        "sha256": empreinte,
+        "video_id": video_id,
+        "horodatage": datetime.now(timezone.utc).isoformat(),
+    })
+    log(f"Miniature mise à jour : {reponse}", "ok")
+    return True